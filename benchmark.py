@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+PowerKey 基准测试
+
+用法:
+    python benchmark.py search --entries 20000
+    python benchmark.py dispatch --burners 8 --threads 4
+    python benchmark.py profiles --profiles 3
+    python benchmark.py manifest --bindings 5000
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import fake_backend
+
+FAKE_KEYBOARD = fake_backend.install()
+
+from config import F_KEYS, TRIGGER_KEYS  # noqa: E402
+
+# 用于生成近似真实程序名的词表
+WORDS = [
+    'visual', 'studio', 'code', 'chrome', 'firefox', 'edge', 'office', 'word', 'excel', 'powerpoint',
+    'outlook', 'teams', 'slack', 'zoom', 'notepad', 'terminal', 'python', 'node', 'docker', 'git',
+    'photoshop', 'illustrator', 'premiere', 'blender', 'unity', 'steam', 'spotify', 'vlc', 'obs',
+    'postman', 'dbeaver', 'putty', 'winscp', 'filezilla', 'everything', 'calculator', 'paint',
+    'remote', 'desktop', 'manager', 'editor', 'viewer', 'player', 'client', 'server', 'tools',
+    'report', 'project', 'budget', 'notes', 'backup', 'share', 'drive', 'admin', 'console',
+]
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def report(title: str, samples_ms):
+    print(f"{title}: p50={percentile(samples_ms, 50):.3f}ms p99={percentile(samples_ms, 99):.3f}ms "
+          f"max={max(samples_ms):.3f}ms (n={len(samples_ms)})")
+
+
+def bench_search(args):
+    """搜索索引: 在生成的快捷方式目录树上测量构建耗时、查询延迟与增量同步耗时"""
+    from search_index import SearchIndex
+    from shell_link import ShellLink, write_shortcut
+
+    rng = random.Random(args.seed)
+    root = tempfile.mkdtemp(prefix='powerkey-bench-')
+    f_keys = list(F_KEYS.values())
+    # 约四分之一的快捷方式放在修饰键层子目录中，构建时一并遍历
+    folders = [os.path.join(root, f_key, *layer) for f_key in f_keys for layer in ((), (), (), ('shift',))]
+    for folder in set(folders):
+        os.makedirs(folder, exist_ok=True)
+
+    def write(name: str, folder: str) -> str:
+        if rng.random() < 0.2:
+            path = os.path.join(folder, f'{name}.url')
+            write_shortcut(path, ShellLink(f'https://example.com/{name.replace(" ", "/")}'))
+        else:
+            path = os.path.join(folder, f'{name}.lnk')
+            write_shortcut(path, ShellLink(f'C:\\Program Files\\{name}\\{name}.exe', '', 'C:\\Users\\me'))
+        return path
+
+    names = [' '.join(rng.sample(WORDS, rng.randint(1, 3))) + f' {i}' for i in range(args.entries)]
+    start = time.perf_counter()
+    for name in names:
+        write(name, rng.choice(folders))
+    print(f"生成 {len(names)} 个快捷方式 (.lnk/.url): {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    # 走真实的构建路径: 扫描F键文件夹及子目录并解析每个快捷方式的目标
+    index = SearchIndex(root, f_keys)
+    index.build()
+    print(f"构建 {len(index)} 项: {index.build_time * 1000:.1f}ms ({index.build_time / len(index) * 1e6:.1f}µs/项)")
+
+    queries = []
+    for _ in range(args.queries):
+        name = rng.choice(names)
+        size = rng.randint(1, min(8, len(name)))
+        offset = rng.randint(0, len(name) - size)
+        queries.append(name[offset:offset + size])
+
+    samples = []
+    hits = 0
+    for query in queries:
+        start = time.perf_counter()
+        hits += bool(index.search(query, 10))
+        samples.append((time.perf_counter() - start) * 1000)
+    report("查询延迟", samples)
+    print(f"命中率: {hits / len(queries):.1%}")
+
+    # 增量同步: 新增一个快捷方式后按目录变更通知同步所在文件夹
+    samples = []
+    for i in range(args.updates):
+        folder = rng.choice(folders)
+        write(f'{rng.choice(WORDS)} new {i}', folder)
+        start = time.perf_counter()
+        index.on_change(folder)
+        samples.append((time.perf_counter() - start) * 1000)
+    report(f"增量同步(每文件夹约 {len(index) // len(set(folders))} 项)", samples)
+
+
+def _burn_cpu():
+    """占满一个 CPU 核心（子进程）"""
+    while True:
+        sum(range(10000))
+
+
+def _burn_gil(stop: threading.Event):
+    """与分发线程争用 GIL 的 Python 线程"""
+    while not stop.is_set():
+        sum(range(10000))
+
+
+def bench_dispatch(args):
+    """分发延迟: 空闲与 CPU/GIL 争用下，设置与不设置线程优先级时从按键到回调返回的延迟"""
+    import keyboard_handler
+    import thread_roles
+    from keyboard_handler import KeyboardHandler
+    from thread_roles import (
+        start_thread, set_thread_role, NicePriorityBackend, NullPriorityBackend, ROLE_DISPATCHER, ROLE_WORKER,
+    )
+
+    # 关闭组合键防抖，使每次事件都走完整的分发路径
+    keyboard_handler.COMBO_REPEAT_WINDOW = 0.0
+    handler = KeyboardHandler()
+    launched = []
+    handler.set_callbacks(
+        on_open_folder=lambda f_key, layer='': launched.append(f_key),
+        on_launch_shortcut=lambda f_key, trigger, layer='': launched.append(f_key),
+        on_game_mode_toggle=lambda is_game_mode: None,
+    )
+    handler._register_shortcut_hotkeys()
+    hotkeys = [f'f1+{trigger}' for trigger in sorted(TRIGGER_KEYS)]
+
+    def measure(label: str, burners: int = 0, threads: int = 0):
+        samples = []
+        applied = []
+
+        def run():
+            # 模拟键盘 hook 线程: 按固定间隔注入事件，测量从预定时刻到回调返回的延迟
+            applied.append(set_thread_role(ROLE_DISPATCHER))  # 再设置一次以确认优先级是否生效
+            for i in range(args.events):
+                target = time.perf_counter() + args.interval
+                time.sleep(args.interval)
+                FAKE_KEYBOARD.fire_hotkey(hotkeys[i % len(hotkeys)])
+                samples.append((time.perf_counter() - target) * 1000)
+
+        stop = threading.Event()
+        processes = [multiprocessing.Process(target=_burn_cpu, daemon=True) for _ in range(burners)]
+        for process in processes:
+            process.start()
+        for _ in range(threads):
+            start_thread(_burn_gil, ROLE_WORKER, None, stop)
+        try:
+            start_thread(run, ROLE_DISPATCHER, 'bench-dispatcher').join()
+        finally:
+            stop.set()
+            for process in processes:
+                process.terminate()
+        report(label if applied[0] else f"{label} (优先级设置失败，如缺少 CAP_SYS_NICE)", samples)
+
+    measure("空闲")
+
+    # 非 Windows 平台默认的空实现不改变调度，对比时改用 nice 值使优先级真正生效
+    backends = [("不设置优先级", NullPriorityBackend())]
+    backends.append(("设置优先级", thread_roles.backend if sys.platform == 'win32' else NicePriorityBackend()))
+    for label, backend in backends:
+        thread_roles.backend = backend
+        if args.burners:
+            measure(f"{label} CPU 争用 ({args.burners} 进程)", burners=args.burners)
+        if args.threads:
+            measure(f"{label} GIL 争用 ({args.threads} 线程)", threads=args.threads)
+    print(f"已分发: {len(launched)}")
+
+
+def bench_profiles(args):
+    """绑定配置: 预扫描耗时、切换延迟以及切换后首次查找延迟"""
+    import shortcut_manager
+    from shortcut_manager import ProfileManager, find_shortcut
+
+    rng = random.Random(args.seed)
+    base = tempfile.mkdtemp(prefix='powerkey-bench-')
+    triggers = sorted(TRIGGER_KEYS)
+    roots = {}
+    for i in range(args.profiles):
+        root = roots[f'profile{i}'] = os.path.join(base, f'profile{i}')
+        for f_key in F_KEYS.values():
+            os.makedirs(os.path.join(root, f_key))
+            for trigger in rng.sample(triggers, args.bindings):
+                open(os.path.join(root, f_key, f'{trigger}.lnk'), 'wb').close()
+
+    manager = shortcut_manager.profiles = ProfileManager(roots)
+    start = time.perf_counter()
+    for profile in manager.profiles.values():
+        profile.compile(F_KEYS.values())
+    compile_time = time.perf_counter() - start
+    print(f"预扫描 {args.profiles} 个配置: {compile_time * 1000:.1f}ms")
+
+    switch_samples = []
+    lookup_samples = []
+    f_keys = list(F_KEYS.values())
+    for _ in range(args.switches):
+        start = time.perf_counter()
+        manager.cycle()
+        switch_samples.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        find_shortcut(rng.choice(f_keys), rng.choice(triggers))
+        lookup_samples.append((time.perf_counter() - start) * 1000)
+    report("切换延迟", switch_samples)
+    report("切换后查找延迟", lookup_samples)
+
+
+def bench_manifest(args):
+    """绑定清单: 导入吞吐量（串行与并行）、导出耗时，并校验导入/导出往返一致"""
+    from manifest import Binding, import_bindings, export_bindings, load_manifest, save_manifest
+
+    rng = random.Random(args.seed)
+    f_keys = list(F_KEYS.values())
+    slots = [(f_key, trigger) for f_key in f_keys for trigger in sorted(TRIGGER_KEYS)]
+    base = tempfile.mkdtemp(prefix='powerkey-bench-')
+    bindings = []
+    for i in range(args.bindings):
+        # 每个根目录最多容纳 len(slots) 个绑定，超出部分分散到多个根目录
+        f_key, trigger = slots[i % len(slots)]
+        name = ' '.join(rng.sample(WORDS, 2))
+        if rng.random() < 0.2:
+            target, arguments, working_dir = f'https://example.com/{name.replace(" ", "/")}', '', ''
+        else:
+            target = f'C:\\Program Files\\{name}\\{name}.exe'
+            arguments = rng.choice(['', '--profile default', f'"{name}"'])
+            working_dir = rng.choice(['', f'C:\\Users\\me\\{name}'])
+        bindings.append(Binding(f_key, trigger, target, arguments, working_dir))
+    groups = [bindings[i:i + len(slots)] for i in range(0, len(bindings), len(slots))]
+
+    for label, workers in (("串行导入", 1), ("并行导入", args.workers)):
+        start = time.perf_counter()
+        written = 0
+        for index, group in enumerate(groups):
+            root = os.path.join(base, f'{label}-{index}')
+            written += import_bindings(group, root, workers=workers).written
+        elapsed = time.perf_counter() - start
+        print(f"{label} {written} 个绑定 (workers={workers or '默认'}): {elapsed * 1000:.1f}ms "
+              f"({written / elapsed:.0f} 个/秒)")
+
+    start = time.perf_counter()
+    exported = []
+    for index in range(len(groups)):
+        exported.append(export_bindings(os.path.join(base, f'并行导入-{index}')))
+    elapsed = time.perf_counter() - start
+    print(f"导出 {sum(map(len, exported))} 个绑定: {elapsed * 1000:.1f}ms")
+
+    # 往返校验: 导出结果写成清单再读回，应与原始绑定一致
+    def key(binding):
+        return binding.f_key, binding.layer, binding.trigger
+
+    for ext in ('.json', '.toml'):
+        path = os.path.join(base, 'manifest' + ext)
+        ok = True
+        for group, result in zip(groups, exported):
+            save_manifest(result, path)
+            ok &= sorted(load_manifest(path), key=key) == sorted(group, key=key)
+        print(f"往返校验 {ext}: {'一致' if ok else '不一致'}")
+        if not ok:
+            return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PowerKey 基准测试')
+    parser.add_argument('--seed', type=int, default=1)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    search = sub.add_parser('search', help=bench_search.__doc__)
+    search.add_argument('--entries', type=int, default=20000, help='索引条目数')
+    search.add_argument('--queries', type=int, default=2000, help='查询次数')
+    search.add_argument('--updates', type=int, default=200, help='增量同步次数')
+    search.set_defaults(func=bench_search)
+
+    dispatch = sub.add_parser('dispatch', help=bench_dispatch.__doc__)
+    dispatch.add_argument('--events', type=int, default=2000, help='每轮注入的事件数')
+    dispatch.add_argument('--interval', type=float, default=0.002, help='事件间隔（秒）')
+    dispatch.add_argument('--burners', type=int, default=os.cpu_count() or 4, help='占用 CPU 的子进程数')
+    dispatch.add_argument('--threads', type=int, default=4, help='争用 GIL 的 Python 线程数')
+    dispatch.set_defaults(func=bench_dispatch)
+
+    profiles = sub.add_parser('profiles', help=bench_profiles.__doc__)
+    profiles.add_argument('--profiles', type=int, default=3, help='配置数')
+    profiles.add_argument('--bindings', type=int, default=20, help='每个F键文件夹中的快捷方式数')
+    profiles.add_argument('--switches', type=int, default=10000, help='切换次数')
+    profiles.set_defaults(func=bench_profiles)
+
+    manifest = sub.add_parser('manifest', help=bench_manifest.__doc__)
+    manifest.add_argument('--bindings', type=int, default=5000, help='绑定数')
+    manifest.add_argument('--workers', type=int, default=None, help='并行导入线程数（默认由线程池决定）')
+    manifest.set_defaults(func=bench_manifest)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -21,6 +21,20 @@ NUMBER_KEYS = set('0123456789')
 # 所有支持的快捷方式触发键
 TRIGGER_KEYS = LETTER_KEYS | NUMBER_KEYS
 
+# 修饰键层（可选）
+# Fx + 修饰键 + 字母/数字/Enter 映射到 BASE_PATH/Fx/<子目录>/
+# 键为修饰键组合（shift/ctrl/alt，用 + 连接，如 'ctrl+shift'），值为子目录名
+# 留空表示不启用，例如: {'shift': 'shift', 'ctrl': 'ctrl'}
+MODIFIER_LAYERS = {}
+
+# 绑定配置（可选）: 名称 -> 快捷方式根目录，第一个为启动时使用的配置
+# 每个配置启动时预先扫描并持续监听，切换时只替换当前配置，不重新注册热键、不重新扫描
+# 留空表示只使用 BASE_PATH，例如:
+# {'工作': BASE_PATH, '演示': os.path.join(os.environ['LOCALAPPDATA'], 'Power Keys 演示')}
+PROFILES = {}
+# 切换到下一个绑定配置的热键（可选），例如: 'ctrl+alt+p'
+PROFILE_HOTKEY = ''
+
 # 常用功能键（直接放行，不拦截）
 # F2: 重命名
 # F3: 搜索 (Win+F3 切换托盘)
@@ -33,7 +47,58 @@ COMMON_F_KEYS = {'f2', 'f3', 'f4', 'f5', 'f11', 'f12'}
 # 游戏模式切换热键
 GAME_MODE_HOTKEY = 'win+esc'
 
+# 全局搜索热键（可选）：弹出搜索框，按文件名和目标名搜索全部快捷方式
+# 留空表示不启用，例如: 'ctrl+alt+space'
+SEARCH_HOTKEY = ''
+
+# 防抖窗口（秒）：同一绑定在窗口内再次触发会被丢弃，按住不放时窗口随之顺延
+# 控制热键（Win+Esc / Win+F3 / Win+F4）
+CONTROL_DEBOUNCE_WINDOW = 0.3
+# Fx 组合键（过滤按住时键盘自动重复造成的重复启动）
+COMBO_REPEAT_WINDOW = 0.5
+
+# 低占用模式: 托盘只保留当前状态的小尺寸图标（隐藏托盘时释放），非必要通知不显示（不加载通知库），
+# 启动完成后回收内存并将空闲页归还系统；游戏模式和当前配置仍由托盘图标和提示文字反映
+LOW_FOOTPRINT = False
+# 低占用模式下托盘图标的最大边长（像素）
+LOW_FOOTPRINT_ICON_SIZE = 32
+# 低占用模式下启动后等待多久（秒）回收内存（等待索引构建、托盘初始化完成）
+LOW_FOOTPRINT_TRIM_DELAY = 10.0
+# 低占用模式下启动并回收内存后常驻内存（RSS）的目标上限（字节），由测试检查
+LOW_FOOTPRINT_RSS_TARGET = 40 * 1024 * 1024
+
 # 通知显示时间（秒）
 NOTIFICATION_DURATION = 3
 
+# 指标服务端口（仅监听 127.0.0.1，输出 Prometheus 文本格式），0 表示不启用
+METRICS_PORT = 0
+
+# 事件日志: 内存环形缓冲区容量（条）
+EVENT_LOG_CAPACITY = 4096
+
+# 事件日志文件目录及滚动设置（仅在出错、托盘请求或退出时写入）
+LOG_DIR = os.path.join(BASE_PATH, 'logs')
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+# hook 卡顿看门狗: 单次 hook 回调超过该时长（秒）即采集其调用栈，0 表示不启用
+# Windows 会静默移除响应过慢的低级键盘钩子（LowLevelHooksTimeout），预算应明显小于该值
+HOOK_STALL_BUDGET = 0.1
+# 保留最近多少次卡顿的调用栈
+HOOK_STALL_CAPACITY = 64
+
+# 会话/电源事件（解锁、远程桌面重连、从睡眠恢复）后立即重新注册 hook；
+# 该时长（秒）内的多个事件只重新注册一次（恢复后通常紧接着解锁）
+SESSION_REARM_COALESCE = 2.0
+
+# 心跳检测间隔（秒）: 会话/电源事件和 hook 卡顿后已立即重新注册，心跳只作为长间隔兜底，
+# 期间已重新注册过则跳过；需要更频繁的兜底时可调小
+HEARTBEAT_INTERVAL = 30 * 60
 
+# 网络路径（UNC 共享、映射网络驱动器）
+# 共享可达性缓存时长（秒），过期后在后台重新探测
+SHARE_REACHABILITY_TTL = 30.0
+# 后台探测超过该时长（秒）仍未返回即视为不可达
+SHARE_PROBE_TIMEOUT = 2.0
+# 启动远程目标的最长等待时间（秒），超时即判定失败并通知
+REMOTE_LAUNCH_TIMEOUT = 5.0
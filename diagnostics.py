@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+PowerKey 进程诊断
+提供内存占用 (RSS)、线程数等进程级指标，按组件汇总的内存报告，以及回收内存并归还系统
+"""
+
+import gc
+import linecache
+import os
+import re
+import sys
+import threading
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+from config import LOG_DIR
+
+# 项目源码目录（项目内文件按模块名归为组件）
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 非必需的大型第三方模块（内存报告中列出是否已加载）
+OPTIONAL_MODULES = ('PIL', 'pystray', 'plyer', 'tkinter')
+
+# 标准库及解释器内部分配归入的组件
+STDLIB_COMPONENT = 'stdlib'
+
+
+def get_rss_bytes() -> int:
+    """
+    获取当前进程的常驻内存 (RSS)
+
+    Returns:
+        RSS 字节数，无法获取时返回 0
+    """
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        get_info = ctypes.windll.psapi.GetProcessMemoryInfo
+        get_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+        if get_info(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return 0
+
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def get_thread_count() -> int:
+    """获取当前存活的 Python 线程数"""
+    return threading.active_count()
+
+
+def component_of(filename: str) -> str:
+    """
+    获取源文件所属的组件
+
+    Returns:
+        项目内文件返回模块名，第三方库返回顶层包名，其余返回 'stdlib'
+    """
+    if filename.startswith(PROJECT_DIR + os.sep):
+        return os.path.splitext(os.path.relpath(filename, PROJECT_DIR))[0].replace(os.sep, '.')
+    parts = filename.replace('\\', '/').split('/')
+    for marker in ('site-packages', 'dist-packages'):
+        if marker in parts:
+            index = parts.index(marker)
+            if index + 1 < len(parts):
+                return os.path.splitext(parts[index + 1])[0]
+    return STDLIB_COMPONENT
+
+
+def memory_by_component(snapshot: tracemalloc.Snapshot) -> List[Tuple[str, int, int]]:
+    """
+    按组件汇总 tracemalloc 快照
+
+    每次分配归入调用栈中最内层的非标准库栈帧所属组件（如 PIL 经由标准库分配的内存仍计入 PIL），
+    调用栈中只有标准库时计入 'stdlib'
+
+    Returns:
+        [(组件, 字节数, 分配块数)]，按字节数降序
+    """
+    totals: Dict[str, List[int]] = {}
+    for stat in snapshot.statistics('traceback'):
+        component = STDLIB_COMPONENT
+        for frame in reversed(stat.traceback):
+            component = component_of(frame.filename)
+            if component != STDLIB_COMPONENT:
+                break
+        total = totals.setdefault(component, [0, 0])
+        total[0] += stat.size
+        total[1] += stat.count
+    return sorted(((name, size, count) for name, (size, count) in totals.items()), key=lambda item: -item[1])
+
+
+def memory_report(top: int = 20) -> str:
+    """生成内存报告: RSS、tracemalloc 按组件汇总（需已启用跟踪）以及已加载的可选模块"""
+    lines = [f"RSS: {get_rss_bytes() / 1024 / 1024:.1f} MiB"]
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        lines.append(f"tracemalloc: 当前 {current / 1024:.0f} KiB，峰值 {peak / 1024:.0f} KiB")
+        lines.append("")
+        lines.append("按组件:")
+        for name, size, count in memory_by_component(tracemalloc.take_snapshot())[:top]:
+            lines.append(f"  {name:<24} {size / 1024:>10.1f} KiB {count:>8} 块")
+    else:
+        lines.append("tracemalloc 未启用（使用 --memory-report 启动以按组件统计）")
+    loaded = [name for name in OPTIONAL_MODULES if name in sys.modules]
+    lines.append("")
+    lines.append(f"已加载的可选模块: {', '.join(loaded) if loaded else '无'}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_memory_report(log_dir: str = LOG_DIR) -> Optional[str]:
+    """
+    将内存报告写入日志目录
+
+    Returns:
+        报告文件路径，写入失败时返回 None
+    """
+    path = os.path.join(log_dir, 'memory.txt')
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(memory_report())
+    except OSError:
+        return None
+    return path
+
+
+def trim_memory() -> int:
+    """
+    回收内存并将空闲页归还系统
+
+    回收循环引用，清空正则与源码行缓存；Windows 下缩减工作集（SetProcessWorkingSetSize），
+    glibc 下调用 malloc_trim
+
+    Returns:
+        RSS 减少的字节数
+    """
+    before = get_rss_bytes()
+    re.purge()
+    linecache.clearcache()
+    gc.collect()
+    import ctypes
+    if sys.platform == 'win32':
+        kernel32 = ctypes.windll.kernel32
+        kernel32.SetProcessWorkingSetSize.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_size_t]
+        kernel32.SetProcessWorkingSetSize(kernel32.GetCurrentProcess(), ctypes.c_size_t(-1).value,
+                                          ctypes.c_size_t(-1).value)
+    else:
+        try:
+            ctypes.CDLL('libc.so.6').malloc_trim(0)
+        except (OSError, AttributeError):
+            pass
+    return max(0, before - get_rss_bytes())
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+PowerKey 结构化事件日志
+热路径只向固定容量的环形缓冲区写入紧凑记录，不做任何 I/O；
+仅在出错、托盘请求或退出时由后台线程写入滚动日志文件
+"""
+
+import itertools
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from config import EVENT_LOG_CAPACITY, LOG_DIR, LOG_MAX_BYTES, LOG_BACKUP_COUNT
+from thread_roles import start_thread, ROLE_BACKGROUND
+
+if TYPE_CHECKING:
+    from logging.handlers import RotatingFileHandler
+
+# 事件码
+EV_STARTUP = 1
+EV_SHUTDOWN = 2
+EV_OPEN_FOLDER = 10
+EV_OPEN_FOLDER_FAILED = 11
+EV_LAUNCH = 20
+EV_LAUNCH_MISS = 21
+EV_LAUNCH_FAILED = 22
+EV_GAME_MODE_ON = 30
+EV_GAME_MODE_OFF = 31
+EV_AUTOSTART_ENABLED = 40
+EV_AUTOSTART_DISABLED = 41
+EV_AUTOSTART_FAILED = 42
+EV_TRAY_FAILED = 50
+EV_INDEX_BUILT = 60
+EV_HOOK_STALL = 70
+EV_PROFILE_SWITCH = 80
+EV_SESSION_REARM = 90
+EV_MEMORY_TRIMMED = 100
+
+EVENT_NAMES = {
+    EV_STARTUP: 'startup',
+    EV_SHUTDOWN: 'shutdown',
+    EV_OPEN_FOLDER: 'open_folder',
+    EV_OPEN_FOLDER_FAILED: 'open_folder_failed',
+    EV_LAUNCH: 'launch',
+    EV_LAUNCH_MISS: 'launch_miss',
+    EV_LAUNCH_FAILED: 'launch_failed',
+    EV_GAME_MODE_ON: 'game_mode_on',
+    EV_GAME_MODE_OFF: 'game_mode_off',
+    EV_AUTOSTART_ENABLED: 'autostart_enabled',
+    EV_AUTOSTART_DISABLED: 'autostart_disabled',
+    EV_AUTOSTART_FAILED: 'autostart_failed',
+    EV_TRAY_FAILED: 'tray_failed',
+    EV_INDEX_BUILT: 'index_built',
+    EV_HOOK_STALL: 'hook_stall',
+    EV_PROFILE_SWITCH: 'profile_switch',
+    EV_SESSION_REARM: 'session_rearm',
+    EV_MEMORY_TRIMMED: 'memory_trimmed',
+}
+
+# 出现这些事件时自动写盘
+ERROR_EVENTS = {EV_OPEN_FOLDER_FAILED, EV_LAUNCH_FAILED, EV_AUTOSTART_FAILED, EV_TRAY_FAILED, EV_HOOK_STALL}
+
+# 记录: (序号, 时间戳, 事件码, F键, 触发键, 耗时秒数, 详情)
+Record = Tuple[int, float, int, str, str, float, str]
+
+
+class EventLog:
+    """
+    固定容量的事件环形缓冲区
+
+    record 只做一次计数器自增和一次列表赋值（GIL 下均为原子操作），不加锁、不分配缓冲区；
+    写满后覆盖最旧的记录
+    """
+
+    def __init__(self, capacity: int = EVENT_LOG_CAPACITY, log_dir: str = LOG_DIR):
+        self.capacity = capacity
+        self.log_dir = log_dir
+        self._slots: List[Optional[Record]] = [None] * capacity
+        self._seq = itertools.count(1)
+        self._flushed_seq = 0
+        self._flush_lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._file_handler: Optional['RotatingFileHandler'] = None
+        self._thread: Optional[threading.Thread] = None
+        self.running = False
+
+    def record(self, code: int, f_key: str = '', trigger: str = '', duration: float = 0.0, detail: str = ''):
+        """
+        写入一条事件记录（可在 hook 线程调用）
+
+        Args:
+            code: 事件码 EV_*
+            f_key: F键名称
+            trigger: 触发键
+            duration: 耗时（秒）
+            detail: 附加信息，仅用于错误描述
+        """
+        seq = next(self._seq)
+        self._slots[seq % self.capacity] = (seq, time.time(), code, f_key, trigger, duration, detail)
+        if code in ERROR_EVENTS:
+            self._flush_requested.set()
+
+    def snapshot(self) -> List[Record]:
+        """按时间顺序返回缓冲区中的全部记录"""
+        return sorted(r for r in list(self._slots) if r is not None)
+
+    def request_flush(self):
+        """请求后台线程写盘（不阻塞调用方）"""
+        self._flush_requested.set()
+
+    def flush(self) -> int:
+        """
+        将上次写盘之后的新记录写入滚动日志文件
+
+        Returns:
+            写入的记录数
+        """
+        with self._flush_lock:
+            records = [r for r in self.snapshot() if r[0] > self._flushed_seq]
+            if not records:
+                return 0
+            import logging
+            try:
+                handler = self._get_file_handler()
+                for entry in records:
+                    handler.emit(logging.makeLogRecord({'msg': format_record(entry)}))
+                handler.flush()
+            except OSError:
+                return 0
+            self._flushed_seq = records[-1][0]
+            return len(records)
+
+    def _get_file_handler(self) -> 'RotatingFileHandler':
+        # logging.handlers 连带导入 socket、pickle 等模块，首次写盘时才导入
+        if self._file_handler is None:
+            from logging.handlers import RotatingFileHandler
+            os.makedirs(self.log_dir, exist_ok=True)
+            self._file_handler = RotatingFileHandler(
+                os.path.join(self.log_dir, 'powerkey.log'),
+                maxBytes=LOG_MAX_BYTES,
+                backupCount=LOG_BACKUP_COUNT,
+                encoding='utf-8',
+            )
+        return self._file_handler
+
+    def _flush_loop(self):
+        """后台写盘线程"""
+        while self.running:
+            self._flush_requested.wait()
+            self._flush_requested.clear()
+            self.flush()
+
+    def start(self):
+        """启动后台写盘线程"""
+        if self.running:
+            return
+        self.running = True
+        self._thread = start_thread(self._flush_loop, ROLE_BACKGROUND, 'PowerKey-eventlog')
+
+    def stop(self):
+        """停止后台线程并写入剩余记录"""
+        self.running = False
+        self._flush_requested.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        self.flush()
+        if self._file_handler is not None:
+            self._file_handler.close()
+            self._file_handler = None
+
+
+def format_record(record: Record) -> str:
+    """将记录格式化为一行文本"""
+    seq, timestamp, code, f_key, trigger, duration, detail = record
+    stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
+    line = f"{stamp}.{int(timestamp % 1 * 1000):03d} #{seq} {EVENT_NAMES.get(code, code)}"
+    if f_key:
+        line += f" {f_key}"
+    if trigger:
+        line += f"+{trigger}"
+    if duration:
+        line += f" {duration * 1000:.1f}ms"
+    if detail:
+        line += f" {detail}"
+    return line
+
+
+# 全局事件日志
+event_log = EventLog()
+record = event_log.record
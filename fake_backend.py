@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+PowerKey 模拟后端
+用内存实现替代 keyboard / pystray / winreg（以及缺失时的 PIL）和会话/电源事件源，
+并提供可加速的虚拟时钟，供浸泡测试和基准测试在任意平台上驱动真实代码
+"""
+
+import itertools
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+from typing import Callable, Dict, Optional, Set
+
+from session_events import SessionEventSource
+
+
+class FakeEvent:
+    """模拟 keyboard.KeyboardEvent"""
+
+    __slots__ = ('event_type', 'name', 'scan_code')
+
+    def __init__(self, event_type: str, name: str, scan_code: int):
+        self.event_type = event_type
+        self.name = name
+        self.scan_code = scan_code
+
+
+class FakeKeyboard:
+    """
+    模拟 keyboard 库
+
+    只实现 PowerKey 用到的接口，按键事件通过 tap/fire_hotkey 手动注入，
+    hook/热键表的大小可用于检测注册泄漏
+    """
+
+    def __init__(self):
+        self.key_hooks: Dict[object, tuple] = {}   # 句柄 -> (按键, 回调)
+        self.hotkeys: Dict[int, tuple] = {}  # 句柄 -> (热键, 回调)
+        self.pressed: Set[str] = set()
+        self.sent: int = 0
+        self._scan_codes: Dict[str, int] = {}
+        self._handles = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # region keyboard 接口
+
+    def hook_key(self, key: str, callback: Callable, suppress: bool = False):
+        with self._lock:
+            self.key_hooks[callback] = (key, callback)
+        return callback
+
+    def on_press_key(self, key: str, callback: Callable, suppress: bool = False):
+        def handler(event):
+            if event.event_type == 'down':
+                return callback(event)
+            return True
+
+        return self.hook_key(key, handler, suppress)
+
+    def unhook(self, handle):
+        with self._lock:
+            del self.key_hooks[handle]
+
+    def add_hotkey(self, hotkey: str, callback: Callable, suppress: bool = False,
+                   trigger_on_release: bool = False) -> int:
+        handle = next(self._handles)
+        with self._lock:
+            self.hotkeys[handle] = (hotkey, callback)
+        return handle
+
+    def remove_hotkey(self, handle: int):
+        with self._lock:
+            del self.hotkeys[handle]
+
+    def send(self, key: str):
+        self.sent += 1
+
+    def is_pressed(self, key: str) -> bool:
+        return key in self.pressed
+
+    # endregion
+
+    # region 事件注入
+
+    def press(self, *keys: str):
+        """按住修饰键"""
+        self.pressed.update(keys)
+
+    def release(self, *keys: str):
+        """松开修饰键"""
+        self.pressed.difference_update(keys)
+
+    def _emit(self, event_type: str, key: str):
+        with self._lock:
+            scan_code = self._scan_codes.setdefault(key, len(self._scan_codes) + 1)
+            key_hooks = [callback for name, callback in self.key_hooks.values() if name == key]
+        event = FakeEvent(event_type, key, scan_code)
+        for callback in key_hooks:
+            callback(event)
+
+    def key_down(self, key: str):
+        """按下单个按键（不松开），经过该按键的 hook"""
+        self._emit('down', key)
+
+    def key_up(self, key: str):
+        """松开单个按键，经过该按键的 hook"""
+        self._emit('up', key)
+
+    def tap(self, key: str):
+        """按下并松开单个按键，依次经过该按键的 hook"""
+        self._emit('down', key)
+        self._emit('up', key)
+
+    def fire_hotkey(self, hotkey: str) -> int:
+        """触发已注册的热键，返回被调用的回调数量"""
+        with self._lock:
+            callbacks = [callback for name, callback in self.hotkeys.values() if name == hotkey]
+        for callback in callbacks:
+            callback()
+        return len(callbacks)
+
+    def table_size(self) -> int:
+        """当前注册的 hook 与热键总数"""
+        with self._lock:
+            return len(self.key_hooks) + len(self.hotkeys)
+
+    # endregion
+
+    def as_module(self) -> types.ModuleType:
+        module = types.ModuleType('keyboard')
+        for name in ('hook_key', 'on_press_key', 'unhook', 'add_hotkey', 'remove_hotkey', 'send', 'is_pressed'):
+            setattr(module, name, getattr(self, name))
+        module.fake = self
+        return module
+
+
+class FakeClock:
+    """
+    可加速的虚拟时钟
+
+    替换模块中的 time 引用后，不少于 long_sleep 秒的 sleep 会阻塞到 advance 推进虚拟时间，
+    更短的 sleep（如注销与注册之间的等待）立即推进虚拟时间，不占用真实时间
+    """
+
+    def __init__(self, start: float = 1_000_000.0, long_sleep: float = 1.0):
+        self.now = start
+        self.long_sleep = long_sleep
+        self._sleepers: Dict[int, float] = {}
+        self._cond = threading.Condition()
+
+    def time(self) -> float:
+        return self.now
+
+    monotonic = time
+    perf_counter = time
+
+    def sleep(self, seconds: float):
+        with self._cond:
+            if seconds < self.long_sleep:
+                self.now += seconds
+                self._cond.notify_all()
+                return
+            ident = threading.get_ident()
+            self._sleepers[ident] = self.now + seconds
+            self._cond.notify_all()
+            while self.now < self._sleepers[ident]:
+                self._cond.wait()
+            del self._sleepers[ident]
+            self._cond.notify_all()
+
+    def advance(self, seconds: float):
+        """推进虚拟时间并唤醒到期的线程"""
+        with self._cond:
+            self.now += seconds
+            self._cond.notify_all()
+
+    def wait_idle(self, sleepers: int, timeout: float = 10.0) -> bool:
+        """等待指定数量的线程重新进入长 sleep 且均未到期"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                due = [d for d in self._sleepers.values() if d <= self.now]
+                if len(self._sleepers) >= sleepers and not due:
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+
+
+class FakeSessionEventSource(SessionEventSource):
+    """模拟会话/电源事件源，事件通过 fire 在调用方线程中同步注入"""
+
+    def __init__(self):
+        super().__init__()
+        self.running = False
+
+    def start(self) -> bool:
+        self.running = True
+        return True
+
+    def stop(self):
+        self.running = False
+
+    def fire(self, event: str):
+        """注入事件（未启动时忽略，与真实事件源一致）"""
+        if self.running:
+            self._emit(event)
+
+
+class FakeIcon:
+    """模拟 pystray.Icon，run 阻塞到 stop"""
+
+    def __init__(self, name: str, icon=None, title: str = '', menu=None):
+        self.name = name
+        self.icon = icon
+        self.title = title
+        self.menu = menu
+        self.on_activate = None
+        self._stopped = threading.Event()
+
+    def run(self):
+        self._stopped.wait()
+
+    def stop(self):
+        self._stopped.set()
+
+
+class FakeMenu:
+    SEPARATOR = object()
+
+    def __init__(self, *items):
+        self.items = items
+
+
+class FakeMenuItem:
+    def __init__(self, text, action, checked=None, **kwargs):
+        self.text = text
+        self.action = action
+        self.checked = checked
+
+
+def _fake_pystray() -> types.ModuleType:
+    module = types.ModuleType('pystray')
+    module.Icon = FakeIcon
+    module.Menu = FakeMenu
+    module.MenuItem = FakeMenuItem
+    return module
+
+
+def _fake_winreg() -> types.ModuleType:
+    """模拟 winreg，开机自启动项始终为空"""
+    module = types.ModuleType('winreg')
+    module.HKEY_CURRENT_USER = 0
+    module.KEY_READ = module.KEY_WRITE = 0
+    module.REG_SZ = 1
+    module.OpenKey = lambda *args: object()
+    module.CloseKey = lambda key: None
+    module.QueryValueEx = lambda key, name: ('', module.REG_SZ)
+    module.SetValueEx = lambda *args: None
+    module.DeleteValue = lambda key, name: None
+    return module
+
+
+class FakeImage:
+    """PIL 缺失时使用的最小图像对象"""
+
+    def __init__(self, mode: str = 'RGBA', size=(64, 64)):
+        self.mode = mode
+        self.size = size
+
+    def convert(self, mode: str):
+        return FakeImage(mode, self.size)
+
+    def copy(self):
+        return FakeImage(self.mode, self.size)
+
+    def thumbnail(self, size):
+        self.size = tuple(min(a, b) for a, b in zip(self.size, size))
+
+
+def _fake_pil() -> types.ModuleType:
+    pil = types.ModuleType('PIL')
+    image = types.ModuleType('PIL.Image')
+    image.Image = FakeImage
+    image.new = lambda mode, size, color=None: FakeImage(mode, size)
+    image.open = lambda path: FakeImage()
+    draw = types.ModuleType('PIL.ImageDraw')
+    draw.Draw = lambda img: types.SimpleNamespace(text=lambda *a, **k: None, ellipse=lambda *a, **k: None)
+    font = types.ModuleType('PIL.ImageFont')
+    font.truetype = lambda *a, **k: None
+    font.load_default = lambda: None
+    pil.Image, pil.ImageDraw, pil.ImageFont = image, draw, font
+    return pil
+
+
+def install(base_path: Optional[str] = None, fake_tray: bool = True) -> FakeKeyboard:
+    """
+    在导入 PowerKey 模块之前安装模拟后端
+
+    Args:
+        base_path: 作为 LOCALAPPDATA 的目录，默认使用临时目录
+        fake_tray: 是否模拟 pystray 和缺失的 PIL；为 False 时使用真实的托盘和图像库（用于测量真实内存占用）
+
+    Returns:
+        模拟键盘后端
+    """
+    fake = FakeKeyboard()
+    sys.modules['keyboard'] = fake.as_module()
+    if sys.platform != 'win32':
+        sys.modules['winreg'] = _fake_winreg()
+    if fake_tray:
+        sys.modules['pystray'] = _fake_pystray()
+        try:
+            import PIL.Image  # noqa: F401
+            import PIL.ImageDraw  # noqa: F401
+        except ImportError:
+            pil = _fake_pil()
+            sys.modules['PIL'] = pil
+            for name in ('Image', 'ImageDraw', 'ImageFont'):
+                sys.modules[f'PIL.{name}'] = getattr(pil, name)
+    if base_path is None:
+        base_path = tempfile.mkdtemp(prefix='powerkey-')
+    os.environ['LOCALAPPDATA'] = base_path
+    return fake
+
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+快捷方式目录变更监听
+Windows 下使用 ReadDirectoryChangesW 递归监听基础目录，其他平台退化为轮询目录修改时间；
+变更通知按目录汇集，批量创建或删除快捷方式时每个目录只通知一次
+"""
+
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional
+from thread_roles import start_thread, ROLE_BACKGROUND
+
+# 轮询模式下的检查间隔（秒）
+POLL_INTERVAL = 2.0
+
+# 汇集变更通知: 目录静默该时长（秒）后统一通知，持续变更时最长等待 SETTLE_MAX_DELAY
+SETTLE_DELAY = 0.25
+SETTLE_MAX_DELAY = 2.0
+
+# ReadDirectoryChangesW 相关常量
+FILE_LIST_DIRECTORY = 0x0001
+FILE_SHARE_ALL = 0x00000007
+OPEN_EXISTING = 3
+FILE_FLAG_BACKUP_SEMANTICS = 0x02000000
+FILE_NOTIFY_CHANGE_FILE_NAME = 0x00000001
+FILE_NOTIFY_CHANGE_DIR_NAME = 0x00000002
+INVALID_HANDLE_VALUE = -1
+
+
+class FolderWatcher:
+    """
+    目录变更监听器
+
+    每当监听目录树中有文件或文件夹被创建、删除、重命名时，
+    以发生变化的目录完整路径调用 on_change（被删除的子目录由其父目录的通知覆盖）；
+    无法确定具体目录时（如缓冲区溢出）传入根目录
+    """
+
+    def __init__(self, root: str, on_change: Callable[[str], None]):
+        self.root = root
+        self.on_change = on_change
+        self.running = False
+        self._thread: Optional[threading.Thread] = None
+        self._handle = None
+        self._stop_event = threading.Event()
+
+        # 待通知的目录（按首次出现顺序）
+        self._pending: Dict[str, None] = {}
+        self._pending_lock = threading.Lock()
+        self._pending_event = threading.Event()
+        self._dispatch_thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """启动监听线程"""
+        if self.running:
+            return
+        self.running = True
+        self._stop_event.clear()
+        target = self._watch_windows if sys.platform == 'win32' else self._watch_polling
+        self._thread = start_thread(target, ROLE_BACKGROUND, 'PowerKey-watcher')
+        self._dispatch_thread = start_thread(self._dispatch_pending, ROLE_BACKGROUND, 'PowerKey-watcher-notify')
+
+    def stop(self):
+        """停止监听线程"""
+        self.running = False
+        self._stop_event.set()
+        self._pending_event.set()
+        if self._handle is not None:
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            kernel32.CancelIoEx(self._handle, None)
+        for thread in (self._thread, self._dispatch_thread):
+            if thread and thread.is_alive() and thread is not threading.current_thread():
+                thread.join(timeout=1)
+
+    def _notify(self, path: str):
+        try:
+            self.on_change(path)
+        except Exception:
+            pass
+
+    def _queue(self, folders):
+        """登记发生变化的目录，由通知线程汇集后统一通知"""
+        with self._pending_lock:
+            for folder in folders:
+                self._pending[folder] = None
+        self._pending_event.set()
+
+    def _dispatch_pending(self):
+        """通知线程: 等待变更静默后，对每个变化的目录只通知一次"""
+        while self.running:
+            self._pending_event.wait()
+            deadline = time.monotonic() + SETTLE_MAX_DELAY
+            while self.running and time.monotonic() < deadline:
+                self._pending_event.clear()
+                if self._stop_event.wait(SETTLE_DELAY) or not self._pending_event.is_set():
+                    break
+            if not self.running:
+                break
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+                self._pending_event.clear()
+            # 根目录变化会使全部缓存失效，无需再逐个通知子目录
+            for folder in ([self.root] if self.root in pending else pending):
+                self._notify(folder)
+
+    def _watch_windows(self):
+        """使用 ReadDirectoryChangesW 监听（阻塞调用，stop 时通过 CancelIoEx 取消）"""
+        import ctypes
+        from ctypes import wintypes
+
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        kernel32.CreateFileW.restype = wintypes.HANDLE
+        kernel32.CreateFileW.argtypes = [
+            wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, ctypes.c_void_p,
+            wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE,
+        ]
+        kernel32.ReadDirectoryChangesW.argtypes = [
+            wintypes.HANDLE, ctypes.c_void_p, wintypes.DWORD, wintypes.BOOL, wintypes.DWORD,
+            ctypes.POINTER(wintypes.DWORD), ctypes.c_void_p, ctypes.c_void_p,
+        ]
+
+        handle = kernel32.CreateFileW(
+            self.root, FILE_LIST_DIRECTORY, FILE_SHARE_ALL, None,
+            OPEN_EXISTING, FILE_FLAG_BACKUP_SEMANTICS, None,
+        )
+        if handle is None or handle == wintypes.HANDLE(INVALID_HANDLE_VALUE).value:
+            # 无法打开目录时退化为轮询
+            self._watch_polling()
+            return
+        self._handle = handle
+
+        buffer = ctypes.create_string_buffer(64 * 1024)
+        bytes_returned = wintypes.DWORD()
+        try:
+            while self.running:
+                ok = kernel32.ReadDirectoryChangesW(
+                    handle, buffer, len(buffer), True,
+                    FILE_NOTIFY_CHANGE_FILE_NAME | FILE_NOTIFY_CHANGE_DIR_NAME,
+                    ctypes.byref(bytes_returned), None, None,
+                )
+                if not self.running:
+                    break
+                if not ok:
+                    # 被取消或句柄失效
+                    break
+                if bytes_returned.value == 0:
+                    # 缓冲区溢出，无法得知具体变更
+                    self._queue([self.root])
+                    continue
+                self._queue(self._parse_notifications(buffer.raw[:bytes_returned.value]))
+        finally:
+            self._handle = None
+            kernel32.CloseHandle(handle)
+
+    def _parse_notifications(self, data: bytes):
+        """解析 FILE_NOTIFY_INFORMATION 链表，返回受影响的目录（条目所在目录，以及本身是目录的条目）"""
+        changed = {}
+        offset = 0
+        while True:
+            next_offset, _action, name_length = struct.unpack_from('<III', data, offset)
+            name = data[offset + 12:offset + 12 + name_length].decode('utf-16-le')
+            path = os.path.join(self.root, name)
+            changed[os.path.dirname(path)] = None
+            if os.path.isdir(path):
+                changed[path] = None
+            if next_offset == 0:
+                return list(changed)
+            offset += next_offset
+
+    def _snapshot_mtimes(self) -> Dict[str, int]:
+        """记录根目录及其两级子目录的修改时间"""
+        mtimes = {}
+        pending = [(self.root, 0)]
+        while pending:
+            folder, depth = pending.pop()
+            try:
+                mtimes[folder] = os.stat(folder).st_mtime_ns
+                if depth < 2:
+                    with os.scandir(folder) as it:
+                        for entry in it:
+                            if entry.is_dir():
+                                pending.append((entry.path, depth + 1))
+            except OSError:
+                continue
+        return mtimes
+
+    def _watch_polling(self):
+        """轮询目录修改时间"""
+        previous = self._snapshot_mtimes()
+        while self.running:
+            if self._stop_event.wait(POLL_INTERVAL):
+                break
+            current = self._snapshot_mtimes()
+            changed = [f for f in previous.keys() | current.keys() if previous.get(f) != current.get(f)]
+            if changed:
+                self._queue(changed)
+            previous = current
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+hook 卡顿看门狗
+hook 线程只在回调开始和结束时各写一次状态；看门狗线程只在有回调执行时定期检查，回调超过预算时
+通过 sys._current_frames 采集 hook 线程的调用栈，保存到固定容量的缓冲区并按卡顿位置汇总
+"""
+
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import metrics
+from config import HOOK_STALL_BUDGET, HOOK_STALL_CAPACITY, LOG_DIR
+from event_log import record, EV_HOOK_STALL
+from thread_roles import start_thread, ROLE_BACKGROUND
+
+# 项目源码目录（汇总卡顿位置时取项目内最内层的栈帧）
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 每次卡顿保留的最大栈深度
+MAX_STACK_DEPTH = 32
+
+# 栈帧: (文件名, 行号, 函数名)
+Frame = Tuple[str, int, str]
+
+
+def format_frame(frame: Frame) -> str:
+    """格式化栈帧，项目内文件只显示文件名"""
+    filename, lineno, name = frame
+    if filename.startswith(PROJECT_DIR):
+        filename = os.path.relpath(filename, PROJECT_DIR)
+    return f"{filename}:{lineno} {name}"
+
+
+class Stall:
+    """一次 hook 回调卡顿"""
+
+    __slots__ = ('timestamp', 'label', 'f_key', 'trigger', 'elapsed', 'site', 'stack')
+
+    def __init__(self, label: str, f_key: str, trigger: str, elapsed: float, site: Frame, stack: List[Frame]):
+        self.timestamp = time.time()
+        self.label = label
+        self.f_key = f_key
+        self.trigger = trigger
+        self.elapsed = elapsed  # 最后一次观察到的耗时（秒）
+        self.site = site
+        self.stack = stack  # 由外到内
+
+
+class HookWatchdog:
+    """
+    hook 回调卡顿看门狗
+
+    enter/exit 在 hook 线程调用，只做属性赋值和唤醒看门狗，不加锁；
+    检查、采栈和汇总都在看门狗线程中进行，空闲时看门狗线程阻塞等待，不定时唤醒
+    """
+
+    def __init__(self, budget: float = HOOK_STALL_BUDGET, capacity: int = HOOK_STALL_CAPACITY):
+        """
+        初始化看门狗
+
+        Args:
+            budget: 单次回调的时间预算（秒），0 表示不启用
+            capacity: 保留的卡顿记录数
+        """
+        self.budget = budget
+        self.interval = max(budget / 4, 0.005)
+        self.stalls: Deque[Stall] = deque(maxlen=capacity)
+        self.stall_count = 0
+        self._sites: Dict[Frame, List[float]] = {}  # 卡顿位置 -> [次数, 最长耗时]
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Stall], None]] = []
+
+        # hook 线程写入的回调状态
+        self._entered = 0.0  # 当前回调开始时间（perf_counter），0 表示空闲
+        self._ident = 0
+        self._label = ''
+        self._f_key = ''
+        self._trigger = ''
+        self._calls = 0  # 已结束的回调数，用于识别同一次卡顿
+
+        # 看门狗线程状态
+        self._reported_calls = -1
+        self._current: Optional[Stall] = None
+        self._active = threading.Event()  # 有回调开始时由 hook 线程置位，看门狗空闲时清除
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_listener(self, callback: Callable[[Stall], None]):
+        """注册卡顿回调（发现新的卡顿时在看门狗线程中调用）"""
+        self._listeners.append(callback)
+
+    def enter(self, label: str, f_key: str = '', trigger: str = ''):
+        """hook 回调开始（在 hook 线程调用）"""
+        self._ident = threading.get_ident()
+        self._label = label
+        self._f_key = f_key
+        self._trigger = trigger
+        self._entered = time.perf_counter()
+        self._active.set()
+
+    def exit(self):
+        """hook 回调结束（在 hook 线程调用）"""
+        self._entered = 0.0
+        self._calls += 1
+
+    def check(self) -> Optional[Stall]:
+        """
+        检查当前回调是否超出预算（由看门狗线程定期调用）
+
+        Returns:
+            新发现的卡顿，没有时返回 None
+        """
+        calls = self._calls
+        entered = self._entered
+        if not entered:
+            return None
+        elapsed = time.perf_counter() - entered
+        if elapsed < self.budget:
+            return None
+
+        if calls == self._reported_calls:
+            # 同一次卡顿仍在持续，只更新耗时
+            stall = self._current
+            with self._lock:
+                stall.elapsed = elapsed
+                site = self._sites[stall.site]
+                site[1] = max(site[1], elapsed)
+            return None
+
+        frame = sys._current_frames().get(self._ident)
+        if frame is None:
+            return None
+        stack = [(f.filename, f.lineno, f.name) for f in traceback.extract_stack(frame, limit=MAX_STACK_DEPTH)]
+        del frame
+        if self._calls != calls or not stack:
+            return None  # 采栈期间回调已结束
+
+        site = next((f for f in reversed(stack) if f[0].startswith(PROJECT_DIR)), stack[-1])
+        stall = Stall(self._label, self._f_key, self._trigger, elapsed, site, stack)
+        self._reported_calls = calls
+        self._current = stall
+        with self._lock:
+            self.stalls.append(stall)
+            self.stall_count += 1
+            stats = self._sites.setdefault(site, [0, 0.0])
+            stats[0] += 1
+            stats[1] = max(stats[1], elapsed)
+
+        metrics.hook_stalls_total.inc()
+        record(
+            EV_HOOK_STALL, stall.f_key or stall.label, stall.trigger, elapsed,
+            ' <- '.join(format_frame(f) for f in reversed(stack[-8:])),
+        )
+        for callback in self._listeners:
+            callback(stall)
+        return stall
+
+    def stall_sites(self) -> List[Tuple[Frame, int, float]]:
+        """按次数降序返回卡顿位置汇总: (位置, 次数, 最长耗时)"""
+        with self._lock:
+            sites = [(site, int(count), longest) for site, (count, longest) in self._sites.items()]
+        return sorted(sites, key=lambda item: (-item[1], -item[2]))
+
+    def report(self) -> str:
+        """生成卡顿汇总报告"""
+        lines = [f"hook 卡顿: 共 {self.stall_count} 次（预算 {self.budget * 1000:.0f}ms）"]
+        for site, count, longest in self.stall_sites():
+            lines.append(f"  {count:>5} 次  最长 {longest * 1000:8.1f}ms  {format_frame(site)}")
+        with self._lock:
+            recent = list(self.stalls)
+        for stall in reversed(recent):
+            stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stall.timestamp))
+            key = '+'.join(part for part in (stall.f_key, stall.trigger) if part)
+            lines.append('')
+            lines.append(f"{stamp} {stall.label} {key} {stall.elapsed * 1000:.1f}ms")
+            lines.extend(f"    {format_frame(frame)}" for frame in stall.stack)
+        return '\n'.join(lines) + '\n'
+
+    def write_report(self, log_dir: str = LOG_DIR) -> Optional[str]:
+        """
+        将卡顿报告写入日志目录
+
+        Returns:
+            报告文件路径，没有卡顿或写入失败时返回 None
+        """
+        if not self.stall_count:
+            return None
+        path = os.path.join(log_dir, 'hook_stalls.txt')
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.report())
+        except OSError:
+            return None
+        return path
+
+    def _run(self):
+        """看门狗线程 - 空闲时等待回调开始，只在回调执行期间按 interval 轮询"""
+        while not self._stop_event.is_set():
+            if not self._entered:
+                self._active.clear()
+                # 清除后再确认一次，避免错过清除前刚开始的回调
+                if not self._entered:
+                    self._active.wait()
+                    continue
+            if self._stop_event.wait(self.interval):
+                break
+            try:
+                self.check()
+            except Exception:
+                pass
+
+    def start(self):
+        """启动看门狗线程（预算为 0 时不启用）"""
+        if self.budget <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = start_thread(self._run, ROLE_BACKGROUND, 'PowerKey-watchdog')
+
+    def stop(self):
+        """停止看门狗线程"""
+        self._stop_event.set()
+        self._active.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=1)
+
+
+# 全局看门狗
+hook_watchdog = HookWatchdog()
@@ -1,9 +1,17 @@
+from array import array
 from functools import partial
 import time
 import threading
 import keyboard
-from typing import Callable, Dict, List, Optional
-from config import F_KEYS, TRIGGER_KEYS, GAME_MODE_HOTKEY, COMMON_F_KEYS
+import metrics
+from thread_roles import start_thread, set_thread_role, ROLE_DISPATCHER, ROLE_BACKGROUND
+from hook_watchdog import hook_watchdog
+from typing import Callable, Dict, List, Optional, Tuple
+from config import (
+    F_KEYS, TRIGGER_KEYS, GAME_MODE_HOTKEY, COMMON_F_KEYS, MODIFIER_LAYERS,
+    CONTROL_DEBOUNCE_WINDOW, COMBO_REPEAT_WINDOW, SEARCH_HOTKEY, PROFILE_HOTKEY, SESSION_REARM_COALESCE,
+    HEARTBEAT_INTERVAL,
+)
 
 # 需要放行的修饰键（按住这些键时不阻拦 F 键）
 MODIFIER_KEYS = [
@@ -25,8 +33,35 @@ if len(HOTKEY_PARTS) != 2:
     raise ValueError('GAME_MODE_HOTKEY 必须形如 "win+esc"')
 GAME_MODE_MODIFIER_KEY, GAME_MODE_TRIGGER_KEY = HOTKEY_PARTS
 
-# 心跳检测间隔（秒）
-HEARTBEAT_INTERVAL = 300  # 5分钟检查一次
+# 修饰键位掩码（修饰键层按位掩码查找）
+MODIFIER_BITS = {
+    'shift': (1, ('shift', 'left shift', 'right shift')),
+    'ctrl': (2, ('ctrl', 'left ctrl', 'right ctrl')),
+    'alt': (4, ('alt', 'left alt', 'right alt')),
+}
+
+
+def parse_modifier_mask(combo: str) -> int:
+    """将 'ctrl+shift' 形式的修饰键组合转换为位掩码"""
+    mask = 0
+    for part in combo.split('+'):
+        part = part.strip().lower()
+        if part not in MODIFIER_BITS:
+            raise ValueError(f'MODIFIER_LAYERS 只支持 shift/ctrl/alt 组合，无效的修饰键: "{part}"')
+        mask |= MODIFIER_BITS[part][0]
+    return mask
+
+
+# 修饰键层: 位掩码 -> 子目录名（0 为基础层，子目录为空）
+LAYER_MASKS: Dict[int, str] = {parse_modifier_mask(combo): layer for combo, layer in MODIFIER_LAYERS.items()}
+
+# 防抖槽位: 控制热键占用前几个槽位，组合键绑定依次排在其后
+SLOT_GAME_MODE = 0
+SLOT_EXIT = 1
+SLOT_TRAY_TOGGLE = 2
+SLOT_SEARCH = 3
+SLOT_PROFILE = 4
+CONTROL_SLOTS = 5
 
 
 class KeyboardHandler:
@@ -35,14 +70,16 @@ class KeyboardHandler:
     def __init__(self):
         # 游戏模式状态
         self.game_mode: bool = False
-        self.last_toggle_time: float = 0.0
 
         # 回调函数
-        self.on_open_folder: Optional[Callable[[str], None]] = None
-        self.on_launch_shortcut: Optional[Callable[[str, str], None]] = None
+        self.on_open_folder: Optional[Callable[[str, str], None]] = None
+        self.on_launch_shortcut: Optional[Callable[[str, str, str], None]] = None
         self.on_game_mode_toggle: Optional[Callable[[bool], None]] = None
         self.on_exit: Optional[Callable[[], None]] = None  # 退出程序回调
         self.on_toggle_tray: Optional[Callable[[], None]] = None  # 切换托盘显示回调
+        self.on_search: Optional[Callable[[], None]] = None  # 打开搜索启动器回调
+        self.on_switch_profile: Optional[Callable[[], None]] = None  # 切换到下一个绑定配置回调
+        self.on_hooks_refreshed: Optional[Callable[[], None]] = None  # 重新注册全部 hook 后回调
 
         # hook/热键句柄
         self.f_key_handlers: Dict[str, Callable] = {}
@@ -50,21 +87,48 @@ class KeyboardHandler:
         self.toggle_hook = None
         self.exit_hook = None  # Win+F4 退出 hook
         self.tray_toggle_hook = None  # Win+F3 切换托盘 hook
-        self.last_exit_time: float = 0.0  # 防止重复触发
-        self.last_tray_toggle_time: float = 0.0  # 防止重复触发托盘切换
+        self.layer_hooks: List[Callable] = []  # 修饰键层触发键 hook（仅在配置了 MODIFIER_LAYERS 时注册）
+        self.search_hotkey = None  # 搜索热键（仅在配置了 SEARCH_HOTKEY 时注册）
+        self.profile_hotkey = None  # 配置切换热键（仅在配置了 PROFILE_HOTKEY 时注册）
+
+        # 分发表: (修饰键位掩码, F键, 触发键) -> (防抖槽位, F键名称, 触发键, 子目录)
+        self.dispatch_table: Dict[Tuple[int, str, str], Tuple[int, str, str, str]] = self._build_dispatch_table()
+
+        # 防抖: 每个槽位最后一次触发的单调时间，以及被丢弃的重复次数
+        slot_count = CONTROL_SLOTS + len(self.dispatch_table)
+        self._last_fire = array('d', [float('-inf')]) * slot_count
+        self._dropped = array('L', [0]) * slot_count
+
+        # 当前按住的修饰键层 F 键
+        self._layer_key: Optional[str] = None
+        self._layer_used: bool = False
+
+        # 键盘 hook 回调所在线程（首次回调时提升为分发线程优先级）
+        self._dispatcher_ident: Optional[int] = None
+
+        # 游戏模式累计时长
+        self._game_mode_seconds: float = 0.0
+        self._game_mode_since: float = 0.0
 
         # 心跳检测
         self.last_activity_time: float = time.time()  # 最后一次活动时间
         self.heartbeat_thread: Optional[threading.Thread] = None
         self.running: bool = False
 
+        # 心跳与会话事件可能在不同线程中同时请求重新注册
+        self._refresh_lock = threading.Lock()
+        self._last_refresh: float = float('-inf')  # 最后一次重新注册完成的单调时间
+
     def set_callbacks(
         self,
-        on_open_folder: Callable[[str], None],
-        on_launch_shortcut: Callable[[str, str], None],
+        on_open_folder: Callable[[str, str], None],
+        on_launch_shortcut: Callable[[str, str, str], None],
         on_game_mode_toggle: Callable[[bool], None],
         on_exit: Optional[Callable[[], None]] = None,
         on_toggle_tray: Optional[Callable[[], None]] = None,
+        on_search: Optional[Callable[[], None]] = None,
+        on_switch_profile: Optional[Callable[[], None]] = None,
+        on_hooks_refreshed: Optional[Callable[[], None]] = None,
     ):
         """设置回调函数"""
         self.on_open_folder = on_open_folder
@@ -72,6 +136,52 @@ class KeyboardHandler:
         self.on_game_mode_toggle = on_game_mode_toggle
         self.on_exit = on_exit
         self.on_toggle_tray = on_toggle_tray
+        self.on_search = on_search
+        self.on_switch_profile = on_switch_profile
+        self.on_hooks_refreshed = on_hooks_refreshed
+
+    @staticmethod
+    def _build_dispatch_table() -> Dict[Tuple[int, str, str], Tuple[int, str, str, str]]:
+        """构建分发表，基础层与所有修饰键层共用同一次查找"""
+        table = {}
+        for mask, layer in {0: '', **LAYER_MASKS}.items():
+            for key_name, f_key in F_KEYS.items():
+                for trigger in ('enter', *TRIGGER_KEYS):
+                    table[(mask, key_name, trigger)] = (CONTROL_SLOTS + len(table), f_key, trigger, layer)
+        return table
+
+    def _debounce(self, slot: int, window: float) -> bool:
+        """
+        按槽位防抖（单调时钟，窗口随重复事件顺延）
+
+        Returns:
+            True 表示放行，False 表示在窗口内的重复触发已被丢弃
+        """
+        now = time.monotonic()
+        last = self._last_fire[slot]
+        self._last_fire[slot] = now
+        if now - last < window:
+            self._dropped[slot] += 1
+            return False
+        return True
+
+    @property
+    def dropped_repeats(self) -> int:
+        """被防抖丢弃的重复触发总数"""
+        return sum(self._dropped)
+
+    def debounce_stats(self) -> Dict[str, int]:
+        """按绑定统计被丢弃的重复触发次数（只包含非零项）"""
+        names = {
+            SLOT_GAME_MODE: GAME_MODE_HOTKEY,
+            SLOT_EXIT: 'win+f4',
+            SLOT_TRAY_TOGGLE: 'win+f3',
+            SLOT_SEARCH: SEARCH_HOTKEY,
+            SLOT_PROFILE: PROFILE_HOTKEY,
+        }
+        for (mask, key_name, trigger), (slot, f_key, _, layer) in self.dispatch_table.items():
+            names[slot] = f"{f_key}/{layer}+{trigger}" if layer else f"{f_key}+{trigger}"
+        return {names[slot]: count for slot, count in enumerate(self._dropped) if count}
 
     # region 注册/注销
 
@@ -103,7 +213,7 @@ class KeyboardHandler:
             # Fx + Enter
             enter_hotkey = keyboard.add_hotkey(
                 f"{key_name}+enter",
-                partial(self._handle_open_folder_combo, f_key),
+                partial(self._dispatch, 0, key_name, 'enter'),
                 suppress=True,
                 trigger_on_release=False,
             )
@@ -113,13 +223,20 @@ class KeyboardHandler:
             for trigger in TRIGGER_KEYS:
                 combo = keyboard.add_hotkey(
                     f"{key_name}+{trigger}",
-                    partial(self._handle_shortcut_combo, f_key, trigger),
+                    partial(self._dispatch, 0, key_name, trigger),
                     suppress=True,
                     trigger_on_release=False,
                 )
                 self.shortcut_hotkeys.append(combo)
 
+        self._register_layer_hooks()
+        self._register_search_hotkey()
+        self._register_profile_hotkey()
+
     def _unregister_shortcut_hotkeys(self):
+        self._unregister_profile_hotkey()
+        self._unregister_search_hotkey()
+        self._unregister_layer_hooks()
         for hotkey in self.shortcut_hotkeys:
             try:
                 keyboard.remove_hotkey(hotkey)
@@ -127,13 +244,73 @@ class KeyboardHandler:
                 pass
         self.shortcut_hotkeys.clear()
 
+    def _register_layer_hooks(self):
+        """
+        为每个触发键注册一个修饰键层 hook（所有层共用，层数不影响注册数量）
+
+        keyboard 库按完整的按下组合匹配热键，Fx + 字母的热键在按住修饰键时不会触发，
+        因此修饰键层挂在触发键上：库按扫描码只把触发键事件交给回调，
+        回调读取当前修饰键位掩码后在分发表中查找一次
+        """
+        if not LAYER_MASKS or self.layer_hooks:
+            return
+        for trigger in ('enter', *TRIGGER_KEYS):
+            handler = self._create_layer_handler(trigger)
+            self.layer_hooks.append(handler)
+            keyboard.hook_key(trigger, handler, suppress=True)
+
+    def _unregister_layer_hooks(self):
+        self._layer_key = None
+        for handler in self.layer_hooks:
+            try:
+                keyboard.unhook(handler)
+            except KeyError:
+                pass
+        self.layer_hooks.clear()
+
+    def _register_search_hotkey(self):
+        """注册搜索热键（游戏模式下随组合键一起注销）"""
+        if SEARCH_HOTKEY and self.search_hotkey is None:
+            self.search_hotkey = keyboard.add_hotkey(
+                SEARCH_HOTKEY,
+                self._watched('search', self._handle_search_trigger),
+                suppress=True,
+                trigger_on_release=False,
+            )
+
+    def _unregister_search_hotkey(self):
+        if self.search_hotkey is not None:
+            try:
+                keyboard.remove_hotkey(self.search_hotkey)
+            except KeyError:
+                pass
+            self.search_hotkey = None
+
+    def _register_profile_hotkey(self):
+        """注册配置切换热键（游戏模式下随组合键一起注销）"""
+        if PROFILE_HOTKEY and self.profile_hotkey is None:
+            self.profile_hotkey = keyboard.add_hotkey(
+                PROFILE_HOTKEY,
+                self._watched('profile', self._handle_profile_trigger),
+                suppress=True,
+                trigger_on_release=False,
+            )
+
+    def _unregister_profile_hotkey(self):
+        if self.profile_hotkey is not None:
+            try:
+                keyboard.remove_hotkey(self.profile_hotkey)
+            except KeyError:
+                pass
+            self.profile_hotkey = None
+
     # endregion
 
     def _register_toggle_hotkey(self):
         if self.toggle_hook is None:
             self.toggle_hook = keyboard.on_press_key(
                 GAME_MODE_TRIGGER_KEY,
-                self._handle_game_mode_trigger,
+                self._watched('game_mode', self._handle_game_mode_trigger),
                 suppress=False,
             )
 
@@ -147,7 +324,7 @@ class KeyboardHandler:
         if self.exit_hook is None:
             self.exit_hook = keyboard.on_press_key(
                 'f4',
-                self._handle_exit_trigger,
+                self._watched('exit', self._handle_exit_trigger),
                 suppress=False,
             )
 
@@ -162,7 +339,7 @@ class KeyboardHandler:
         if self.tray_toggle_hook is None:
             self.tray_toggle_hook = keyboard.on_press_key(
                 'f3',
-                self._handle_tray_toggle_trigger,
+                self._watched('tray_toggle', self._handle_tray_toggle_trigger),
                 suppress=False,
             )
 
@@ -177,23 +354,35 @@ class KeyboardHandler:
         if not self._is_windows_pressed():
             return
 
-        current = time.time()
-        if current - self.last_tray_toggle_time < 0.3:
+        if not self._debounce(SLOT_TRAY_TOGGLE, CONTROL_DEBOUNCE_WINDOW):
             return
-        self.last_tray_toggle_time = current
 
         if self.on_toggle_tray:
             self.on_toggle_tray()
 
+    def _handle_search_trigger(self):
+        """处理搜索热键触发"""
+        if self.game_mode or not self._debounce(SLOT_SEARCH, CONTROL_DEBOUNCE_WINDOW):
+            return
+        self.last_activity_time = time.time()  # 更新活动时间
+        if self.on_search:
+            self.on_search()
+
+    def _handle_profile_trigger(self):
+        """处理配置切换热键触发"""
+        if self.game_mode or not self._debounce(SLOT_PROFILE, CONTROL_DEBOUNCE_WINDOW):
+            return
+        self.last_activity_time = time.time()  # 更新活动时间
+        if self.on_switch_profile:
+            self.on_switch_profile()
+
     def _handle_exit_trigger(self, event):
         """处理退出快捷键触发"""
         if not self._is_windows_pressed():
             return
 
-        current = time.time()
-        if current - self.last_exit_time < 0.3:
+        if not self._debounce(SLOT_EXIT, CONTROL_DEBOUNCE_WINDOW):
             return
-        self.last_exit_time = current
 
         if self.on_exit:
             self.on_exit()
@@ -203,28 +392,76 @@ class KeyboardHandler:
         if not self._required_modifier_pressed():
             return
 
-        current = time.time()
-        if current - self.last_toggle_time < 0.3:
+        if not self._debounce(SLOT_GAME_MODE, CONTROL_DEBOUNCE_WINDOW):
             return
-        self.last_toggle_time = current
-        self.last_activity_time = current  # 更新活动时间
+        self.last_activity_time = time.time()  # 更新活动时间
         self._toggle_game_mode()
 
-    def _handle_open_folder_combo(self, f_key: str):
-        """处理 Fx + Enter"""
-        if self.game_mode:
+    def _dispatch(self, mask: int, key_name: str, trigger: str):
+        """
+        分发 Fx + Enter / Fx + [修饰键] + 字母/数字
+
+        注意: 返回值必须为假值，keyboard 库据此拦截按键
+        """
+        start = time.perf_counter()
+        self._ensure_dispatcher_role()
+        if mask:
+            self._layer_used = True  # 松开层 F 键时不再补发原按键
+        binding = self.dispatch_table.get((mask, key_name, trigger))
+        if binding is None or self.game_mode:
             return
-        self.last_activity_time = time.time()  # 更新活动时间
-        if self.on_open_folder:
-            self.on_open_folder(f_key)
-
-    def _handle_shortcut_combo(self, f_key: str, trigger: str):
-        """处理 Fx + 字母/数字"""
-        if self.game_mode:
+        slot, f_key, trigger, layer = binding
+        if not self._debounce(slot, COMBO_REPEAT_WINDOW):
             return
         self.last_activity_time = time.time()  # 更新活动时间
-        if self.on_launch_shortcut:
-            self.on_launch_shortcut(f_key, trigger)
+        hook_watchdog.enter('dispatch', f_key, trigger)
+        try:
+            if trigger == 'enter':
+                if self.on_open_folder:
+                    self.on_open_folder(f_key, layer)
+            elif self.on_launch_shortcut:
+                self.on_launch_shortcut(f_key, trigger, layer)
+        finally:
+            hook_watchdog.exit()
+        metrics.dispatched_total.inc()
+        metrics.hook_callback_seconds.observe(time.perf_counter() - start)
+
+    @staticmethod
+    def _watched(label: str, callback: Callable) -> Callable:
+        """包装控制热键回调，向看门狗报告回调的开始和结束"""
+
+        def watched(*args):
+            hook_watchdog.enter(label)
+            try:
+                return callback(*args)
+            finally:
+                hook_watchdog.exit()
+
+        return watched
+
+    def _ensure_dispatcher_role(self):
+        """将执行 hook 回调的线程设为高优先级分发线程（线程变化时重新设置）"""
+        ident = threading.get_ident()
+        if ident != self._dispatcher_ident:
+            self._dispatcher_ident = ident
+            set_thread_role(ROLE_DISPATCHER)
+
+    def _create_layer_handler(self, trigger: str):
+        """生成修饰键层触发键 hook 处理函数 - 仅在按住层 F 键时拦截，返回 False 表示拦截"""
+
+        def handler(event):
+            key_name = self._layer_key
+            if key_name is None:
+                return True
+            mask = self._modifier_mask()
+            if not mask:
+                return True  # 修饰键已松开，交给基础层热键
+            if event.event_type == "down":
+                self._dispatch(mask, key_name, trigger)
+            metrics.suppressed_events_total.inc()
+            return False
+
+        return handler
 
     def _create_f_key_handler(self, key_name: str, f_key: str):
         """生成 F 键 hook 处理函数"""
@@ -232,20 +469,53 @@ class KeyboardHandler:
         def handler(event):
             if self.game_mode:
                 return
-            if event.event_type == "down":
-                self._handle_f_key_down(key_name)
+            start = time.perf_counter()
+            self._ensure_dispatcher_role()
+            hook_watchdog.enter('f_key', f_key)
+            try:
+                if event.event_type == "down":
+                    self._handle_f_key_down(key_name)
+                elif self._layer_key == key_name:
+                    self._handle_f_key_layer_up(key_name)
+            finally:
+                hook_watchdog.exit()
+            metrics.hook_callback_seconds.observe(time.perf_counter() - start)
 
         return handler
 
     def _handle_f_key_down(self, key_name: str):
-        """处理 F 键按下 - 如果有修饰键则放行，否则拦截"""
-        if self._modifier_active():
+        """处理 F 键按下 - 有修饰键时进入对应的修饰键层或放行，否则拦截"""
+        if self._layer_key == key_name:
+            return  # 按住时的自动重复
+        if not self._modifier_active():
+            metrics.suppressed_events_total.inc()
+            return
+        mask = 0 if self._is_windows_pressed() else self._modifier_mask()
+        if mask in LAYER_MASKS:
+            self._layer_key = key_name
+            self._layer_used = False
+            metrics.suppressed_events_total.inc()
+            return
+        self._pass_through_key(key_name)
+
+    def _handle_f_key_layer_up(self, key_name: str):
+        """修饰键层 F 键松开 - 未触发任何绑定时补发原按键（如 Shift+F10）"""
+        self._layer_key = None
+        if not self._layer_used:
             self._pass_through_key(key_name)
 
     def _modifier_active(self) -> bool:
         """判断是否有修饰键被按住"""
         return any(keyboard.is_pressed(mod) for mod in (MODIFIER_KEYS + WINDOWS_KEYS))
 
+    def _modifier_mask(self) -> int:
+        """当前按住的 shift/ctrl/alt 位掩码"""
+        mask = 0
+        for bit, names in MODIFIER_BITS.values():
+            if any(keyboard.is_pressed(name) for name in names):
+                mask |= bit
+        return mask
+
     def _is_windows_pressed(self) -> bool:
         """是否按下了 Windows 键"""
         return any(keyboard.is_pressed(key) for key in WINDOWS_KEYS)
@@ -261,6 +531,7 @@ class KeyboardHandler:
         handler = self.f_key_handlers.get(key_name)
         if handler is None:
             return
+        metrics.passed_events_total.inc()
         keyboard.unhook(handler)
         try:
             keyboard.send(key_name)
@@ -270,6 +541,11 @@ class KeyboardHandler:
     def _toggle_game_mode(self):
         """切换游戏模式"""
         self.game_mode = not self.game_mode
+        now = time.monotonic()
+        if self.game_mode:
+            self._game_mode_since = now
+        else:
+            self._game_mode_seconds += now - self._game_mode_since
         if self.game_mode:
             self._unregister_f_key_hooks()
             self._unregister_shortcut_hotkeys()
@@ -280,8 +556,56 @@ class KeyboardHandler:
         if self.on_game_mode_toggle:
             self.on_game_mode_toggle(self.game_mode)
 
+    def game_mode_seconds(self) -> float:
+        """游戏模式累计时长（秒，含当前这一段）"""
+        if self.game_mode:
+            return self._game_mode_seconds + time.monotonic() - self._game_mode_since
+        return self._game_mode_seconds
+
+    def _refresh_hooks(self, counter: metrics.Counter):
+        """静默重新注册所有 hook（防止失效），调用方需持有 _refresh_lock"""
+        counter.inc()
+        if not self.game_mode:
+            self._unregister_f_key_hooks()
+            self._unregister_shortcut_hotkeys()
+            time.sleep(0.1)
+            self._register_f_key_hooks()
+            self._register_shortcut_hotkeys()
+
+        # 重新注册游戏模式切换和退出热键
+        self._unregister_toggle_hotkey()
+        self._unregister_exit_hotkey()
+        self._unregister_tray_toggle_hotkey()
+        time.sleep(0.1)
+        self._register_toggle_hotkey()
+        self._register_exit_hotkey()
+        self._register_tray_toggle_hotkey()
+        self._last_refresh = time.monotonic()
+
+        if self.on_hooks_refreshed:
+            self.on_hooks_refreshed()
+
+    def rearm(self, coalesce: bool = True, counter: metrics.Counter = metrics.session_rearms_total) -> bool:
+        """
+        立即重新注册所有 hook（会话/电源事件或 hook 卡顿后）
+
+        Args:
+            coalesce: SESSION_REARM_COALESCE 秒内已重新注册过时跳过（恢复、解锁等事件往往接连到达）
+            counter: 计入的重新注册次数指标
+
+        Returns:
+            是否执行了重新注册
+        """
+        with self._refresh_lock:
+            if not self.running:
+                return False
+            if coalesce and time.monotonic() - self._last_refresh < SESSION_REARM_COALESCE:
+                return False
+            self._refresh_hooks(counter)
+            return True
+
     def _heartbeat_check(self):
-        """心跳检测线程 - 定期静默刷新 hook（无日志输出）"""
+        """心跳检测线程 - 长时间未重新注册时静默刷新 hook（无日志输出）"""
         while self.running:
             try:
                 time.sleep(HEARTBEAT_INTERVAL)
@@ -289,22 +613,10 @@ class KeyboardHandler:
                 if not self.running:
                     break
 
-                # 静默重新注册所有 hook（防止失效）
-                if not self.game_mode:
-                    self._unregister_f_key_hooks()
-                    self._unregister_shortcut_hotkeys()
-                    time.sleep(0.1)
-                    self._register_f_key_hooks()
-                    self._register_shortcut_hotkeys()
-
-                # 重新注册游戏模式切换和退出热键
-                self._unregister_toggle_hotkey()
-                self._unregister_exit_hotkey()
-                self._unregister_tray_toggle_hotkey()
-                time.sleep(0.1)
-                self._register_toggle_hotkey()
-                self._register_exit_hotkey()
-                self._register_tray_toggle_hotkey()
+                with self._refresh_lock:
+                    # 期间已因会话事件重新注册过则跳过本次
+                    if time.monotonic() - self._last_refresh >= HEARTBEAT_INTERVAL:
+                        self._refresh_hooks(metrics.hook_refreshes_total)
 
             except Exception:
                 # 静默处理异常，不输出
@@ -318,10 +630,10 @@ class KeyboardHandler:
         self._register_toggle_hotkey()
         self._register_exit_hotkey()
         self._register_tray_toggle_hotkey()
+        self._last_refresh = time.monotonic()
 
         # 启动心跳检测线程（静默运行）
-        self.heartbeat_thread = threading.Thread(target=self._heartbeat_check, daemon=True)
-        self.heartbeat_thread.start()
+        self.heartbeat_thread = start_thread(self._heartbeat_check, ROLE_BACKGROUND, 'PowerKey-heartbeat')
 
     def stop(self):
         """停止监听键盘事件"""
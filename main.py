@@ -2,16 +2,42 @@
 """
 PowerKey - 功能键快捷方式启动器
 主程序入口
+
+用法:
+    python main.py                          运行程序
+    python main.py --import bindings.toml   从清单批量生成快捷方式
+    python main.py --export bindings.json   将现有快捷方式导出为清单
+    python main.py --memory-report          运行程序并按组件统计内存（托盘"导出诊断日志"或退出时写入 memory.txt）
 """
 
+import argparse
 import sys
+import time
+import tracemalloc
 import ctypes
 from ctypes import wintypes
 
+# 按组件统计内存需要在导入各模块之前开始跟踪
+if '--memory-report' in sys.argv:
+    tracemalloc.start(25)
+
 from keyboard_handler import KeyboardHandler
-from shortcut_manager import init_base_folder, open_folder, launch_shortcut
+from shortcut_manager import init_base_folder, open_folder, launch_shortcut, launch_path, profiles, Profile
 from system_tray import SystemTray
-from config import BASE_PATH
+from config import (
+    F_KEYS, MODIFIER_LAYERS, SEARCH_HOTKEY, PROFILE_HOTKEY, METRICS_PORT, LOW_FOOTPRINT, LOW_FOOTPRINT_TRIM_DELAY,
+)
+import metrics
+from thread_roles import Worker, start_thread, ROLE_BACKGROUND
+from diagnostics import get_rss_bytes, trim_memory, write_memory_report
+from hook_watchdog import hook_watchdog
+from network_paths import share_monitor
+from session_events import create_session_event_source
+from event_log import (
+    event_log, record,
+    EV_STARTUP, EV_SHUTDOWN, EV_OPEN_FOLDER, EV_LAUNCH, EV_LAUNCH_MISS, EV_GAME_MODE_ON, EV_GAME_MODE_OFF,
+    EV_INDEX_BUILT, EV_PROFILE_SWITCH, EV_SESSION_REARM, EV_MEMORY_TRIMMED,
+)
 
 
 # Windows API 常量
@@ -44,7 +70,25 @@ class NOTIFYICONDATA(ctypes.Structure):
     ]
 
 
-def show_notification(title: str, message: str):
+# 通知工作线程（低于正常优先级，避免通知和托盘图标更新阻塞键盘 hook 线程）
+notification_worker = Worker('PowerKey-notify')
+
+
+def show_notification(title: str, message: str, essential: bool = False):
+    """
+    显示 Windows 气泡通知（在通知工作线程中异步显示）
+
+    Args:
+        title: 通知标题
+        message: 通知内容
+        essential: 是否为必要通知（低占用模式下只显示必要通知，其余不加载通知库）
+    """
+    if LOW_FOOTPRINT and not essential:
+        return
+    notification_worker.submit(_notify, title, message)
+
+
+def _notify(title: str, message: str):
     """
     显示 Windows 气泡通知（使用 plyer 库，不会显示 PowerShell 图标）
 
@@ -71,7 +115,25 @@ class PowerKey:
 
     def __init__(self):
         self.keyboard_handler = KeyboardHandler()
-        self.system_tray = SystemTray(on_exit=self._on_exit, on_restart=self._on_restart)
+        self.system_tray = SystemTray(
+            on_exit=self._on_exit, on_restart=self._on_restart, on_switch_profile=self._switch_profile
+        )
+        # 每个绑定配置各有一份搜索索引，切换配置时只替换启动器使用的索引
+        self.search_indexes = {}
+        self.launcher = None
+        if SEARCH_HOTKEY:
+            from search_index import SearchIndex
+            from type_ahead import TypeAheadLauncher
+            self.search_indexes = {
+                name: SearchIndex(profile.root, F_KEYS.values()) for name, profile in profiles.profiles.items()
+            }
+            self.launcher = TypeAheadLauncher(self.search_indexes[profiles.active.name], launch_path)
+            profiles.add_listener(self._on_profile_changed)
+        self.metrics_server = metrics.MetricsServer(METRICS_PORT) if METRICS_PORT else None
+        # 解锁、远程桌面重连、从睡眠恢复后立即重新注册键盘钩子
+        self.session_events = create_session_event_source()
+        # 启动工作线程（键盘 hook 线程只负责分发，打开文件夹和启动程序在这里执行）
+        self.launch_worker = Worker('PowerKey-launch')
         self._running = True
         self._setup_callbacks()
 
@@ -82,8 +144,36 @@ class PowerKey:
             on_launch_shortcut=self._on_launch_shortcut,
             on_game_mode_toggle=self._on_game_mode_toggle,
             on_exit=self._on_exit,
-            on_toggle_tray=self._on_toggle_tray
+            on_toggle_tray=self._on_toggle_tray,
+            on_search=self._on_search if self.launcher else None,
+            on_switch_profile=self._switch_profile if len(profiles.names) > 1 else None,
+            on_hooks_refreshed=self._on_hooks_refreshed,
         )
+        hook_watchdog.add_listener(self._on_hook_stall)
+        self.session_events.add_listener(self._on_session_event)
+
+    def _on_search(self):
+        """打开搜索启动器回调"""
+        self.launcher.show()
+
+    def _switch_profile(self, name: str = ''):
+        """
+        切换绑定配置（托盘菜单或热键触发）
+
+        Args:
+            name: 目标配置名称，为空表示切换到下一个配置
+        """
+        start = time.perf_counter()
+        profile = profiles.switch(name) if name else profiles.cycle()
+        if profile is None:
+            return
+        record(EV_PROFILE_SWITCH, trigger=profile.name, duration=time.perf_counter() - start)
+        notification_worker.submit(self.system_tray.update_state)
+        show_notification("PowerKey", f"已切换到配置: {profile.name}")
+
+    def _on_profile_changed(self, profile: Profile):
+        """配置切换后让搜索启动器使用该配置的索引"""
+        self.launcher.index = self.search_indexes[profile.name]
 
     def _on_toggle_tray(self):
         """切换托盘图标显示/隐藏回调"""
@@ -96,7 +186,7 @@ class PowerKey:
         # 根据切换后的状态显示通知
         if was_visible:
             # 之前是显示的，现在隐藏了
-            show_notification("PowerKey", "任务托盘已隐藏")
+            show_notification("PowerKey", "任务托盘已隐藏", essential=True)
         else:
             # 之前是隐藏的，现在显示了
             show_notification("PowerKey", "任务托盘已显示")
@@ -113,6 +203,8 @@ class PowerKey:
         show_notification("PowerKey", "程序正在重启...")
         self.keyboard_handler.stop()
         self.system_tray.stop()
+        record(EV_SHUTDOWN, detail='restart')
+        event_log.stop()
 
         # 获取当前可执行文件路径
         import os
@@ -134,28 +226,41 @@ class PowerKey:
         subprocess.Popen([executable])
         sys.exit(0)
 
-    def _on_open_folder(self, f_key: str):
+    def _on_open_folder(self, f_key: str, layer: str = ''):
         """
-        打开文件夹回调
+        打开文件夹回调（交给启动工作线程执行）
         
         Args:
             f_key: F键名称
+            layer: 修饰键层子目录，为空表示基础层
         """
-        if open_folder(f_key):
-            print(f"已打开文件夹: {f_key}")
+        self.launch_worker.submit(self._open_folder, f_key, layer)
+
+    def _open_folder(self, f_key: str, layer: str):
+        """在启动工作线程中打开文件夹"""
+        start = time.perf_counter()
+        if open_folder(f_key, layer):
+            record(EV_OPEN_FOLDER, f_key, layer, time.perf_counter() - start)
     
-    def _on_launch_shortcut(self, f_key: str, letter: str):
+    def _on_launch_shortcut(self, f_key: str, letter: str, layer: str = ''):
         """
-        启动快捷方式回调
+        启动快捷方式回调（交给启动工作线程执行）
         
         Args:
             f_key: F键名称
             letter: 字母键
+            layer: 修饰键层子目录，为空表示基础层
         """
-        if launch_shortcut(f_key, letter):
-            print(f"已启动: {f_key} + {letter}")
+        self.launch_worker.submit(self._launch_shortcut, f_key, letter, layer)
+
+    def _launch_shortcut(self, f_key: str, letter: str, layer: str):
+        """在启动工作线程中启动快捷方式"""
+        name = f"{f_key}/{layer}" if layer else f_key
+        start = time.perf_counter()
+        if launch_shortcut(f_key, letter, layer):
+            record(EV_LAUNCH, name, letter, time.perf_counter() - start)
         else:
-            print(f"未找到快捷方式: {f_key}/{letter}")
+            record(EV_LAUNCH_MISS, name, letter, time.perf_counter() - start)
     
     def _on_game_mode_toggle(self, is_game_mode: bool):
         """
@@ -164,23 +269,70 @@ class PowerKey:
         Args:
             is_game_mode: 是否为游戏模式
         """
+        notification_worker.submit(self.system_tray.set_game_mode, is_game_mode)
         if is_game_mode:
-            print("已进入游戏模式")
+            record(EV_GAME_MODE_ON)
             show_notification("PowerKey", "🎮 游戏模式已开启")
         else:
-            print("已退出游戏模式")
+            record(EV_GAME_MODE_OFF)
             show_notification("PowerKey", "⌨️ 游戏模式已关闭")
     
+    def _on_hook_stall(self, stall):
+        """
+        hook 回调超出预算: 系统可能已移除键盘钩子，托盘显示异常状态并立即重新注册
+
+        重新注册在通知工作线程中排在托盘更新之后执行，完成后由 _on_hooks_refreshed 恢复托盘状态
+        """
+        notification_worker.submit(self.system_tray.set_degraded, True)
+        notification_worker.submit(self.keyboard_handler.rearm, False, metrics.stall_rearms_total)
+
+    def _on_hooks_refreshed(self):
+        """键盘钩子已重新注册，恢复托盘状态"""
+        if self.system_tray.degraded:
+            notification_worker.submit(self.system_tray.set_degraded, False)
+
+    def _on_session_event(self, event: str):
+        """会话/电源事件（在事件源线程中调用）: 键盘钩子可能已被系统移除，立即重新注册"""
+        if self.keyboard_handler.rearm():
+            record(EV_SESSION_REARM, detail=event)
+
+    def _register_metrics(self):
+        """注册需要在抓取时读取的指标"""
+        handler = self.keyboard_handler
+        metrics.registry.function_counter(
+            'powerkey_game_mode_seconds_total', '游戏模式累计时长（秒）', handler.game_mode_seconds)
+        metrics.registry.function_counter(
+            'powerkey_debounced_total', '被防抖丢弃的重复触发次数', lambda: handler.dropped_repeats)
+        metrics.registry.function_gauge(
+            'powerkey_game_mode', '是否处于游戏模式', lambda: int(handler.game_mode))
+        metrics.registry.function_gauge(
+            'powerkey_resident_bytes', '进程常驻内存（RSS，字节）', get_rss_bytes)
+
+    def _trim_memory(self):
+        """低占用模式: 启动完成后回收内存并将空闲页归还系统"""
+        time.sleep(LOW_FOOTPRINT_TRIM_DELAY)
+        if self._running:
+            freed = trim_memory()
+            record(EV_MEMORY_TRIMMED, detail=f"{freed / 1024 / 1024:.1f} MiB")
+
     def run(self):
         """运行主程序"""
         print("=" * 50)
         print("PowerKey 功能键快捷方式启动器")
         print("=" * 50)
-        print(f"快捷方式目录: {BASE_PATH}")
+        for name, profile in profiles.profiles.items():
+            print(f"快捷方式目录: {profile.root}" if len(profiles.names) == 1 else f"配置 {name}: {profile.root}")
         print()
         print("使用方法:")
         print("  Fx + Enter    - 打开对应文件夹")
         print("  Fx + 字母/数字 - 启动对应快捷方式")
+        if MODIFIER_LAYERS:
+            print("  Fx + 修饰键 + 字母/数字 - 启动修饰键层快捷方式 (" + ", ".join(
+                f"{combo} -> Fx/{layer}" for combo, layer in MODIFIER_LAYERS.items()) + ")")
+        if SEARCH_HOTKEY:
+            print(f"  {SEARCH_HOTKEY.title():<13} - 搜索并启动任意快捷方式")
+        if PROFILE_HOTKEY and len(profiles.names) > 1:
+            print(f"  {PROFILE_HOTKEY.title():<13} - 切换到下一个绑定配置")
         print("  Win + Esc     - 切换游戏模式")
         print("  Win + F3      - 切换托盘图标显示/隐藏")
         print("  Win + F4      - 退出程序")
@@ -196,29 +348,130 @@ class PowerKey:
         # 初始化基础文件夹
         init_base_folder()
 
+        # 启动工作线程
+        notification_worker.start()
+        self.launch_worker.start()
+
+        # 后台探测快捷方式所指向的网络共享，远程启动失败时通知
+        share_monitor.add_listener(
+            lambda share, reason: show_notification("PowerKey", f"网络位置{reason}: {share}", essential=True)
+        )
+        share_monitor.start(profile.root for profile in profiles.profiles.values())
+
+        # 后台构建各配置的搜索索引，之后随目录变更增量更新
+        for name, index in self.search_indexes.items():
+            profiles.profiles[name].cache.add_listener(index.on_change)
+            index.build_async(
+                on_done=lambda index, name=name: record(
+                    EV_INDEX_BUILT, trigger=name, duration=index.build_time, detail=f"{len(index)} 项")
+            )
+
+        # 启动事件日志后台写盘线程
+        event_log.start()
+        record(EV_STARTUP)
+
+        # 启动 hook 卡顿看门狗
+        hook_watchdog.start()
+
+        # 启动指标服务（独立线程，不经过键盘 hook）
+        if self.metrics_server is not None:
+            self._register_metrics()
+            try:
+                self.metrics_server.start()
+                print(f"指标服务: http://127.0.0.1:{self.metrics_server.port}/metrics")
+            except OSError as e:
+                print(f"指标服务启动失败: {e}")
+                self.metrics_server = None
+
         # 启动键盘监听
         self.keyboard_handler.start()
 
+        # 订阅会话/电源事件（订阅失败时只能依靠心跳定时刷新）
+        self.session_events.start()
+
         # 启动系统托盘
         self.system_tray.start()
 
         # 显示启动通知
         show_notification("PowerKey", "程序已启动，按 Win+Esc 切换游戏模式")
 
+        if LOW_FOOTPRINT:
+            start_thread(self._trim_memory, ROLE_BACKGROUND, 'PowerKey-trim')
+
         try:
             # 保持程序运行
-            import time
             while self._running:
                 time.sleep(0.1)
         except KeyboardInterrupt:
             print("\n程序已退出")
         finally:
+            self.session_events.stop()
             self.keyboard_handler.stop()
             self.system_tray.stop()
+            profiles.stop_watching()
+            share_monitor.stop()
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+            self.launch_worker.stop()
+            notification_worker.stop()
+            hook_watchdog.stop()
+            hook_watchdog.write_report()
+            report = write_memory_report() if tracemalloc.is_tracing() else None
+            record(EV_SHUTDOWN, detail=f"内存报告: {report}" if report else '')
+            event_log.stop()
+
+
+def run_manifest_command(args) -> int:
+    """
+    执行清单导入/导出命令
+
+    Returns:
+        进程退出码
+    """
+    from manifest import load_manifest, save_manifest, import_bindings, export_bindings
+
+    profile = profiles.profiles.get(args.profile) if args.profile else profiles.active
+    if profile is None:
+        print(f"未知的绑定配置: {args.profile}（可用: {', '.join(profiles.names)}）")
+        return 2
+    try:
+        if args.export_path:
+            bindings = export_bindings(profile.root)
+            save_manifest(bindings, args.export_path)
+            print(f"已导出 {len(bindings)} 个绑定到 {args.export_path}")
+            return 0
+        bindings = load_manifest(args.import_path)
+    except (OSError, ValueError) as e:
+        print(f"清单处理失败: {e}")
+        return 1
+
+    # 正在运行的实例通过目录变更监听汇集变更，每个文件夹只刷新一次
+    result = import_bindings(bindings, profile.root, overwrite=args.overwrite, workers=args.workers)
+    print(f"已生成 {result.written} 个快捷方式，跳过 {result.skipped} 个已存在的绑定，"
+          f"失败 {len(result.failed)} 个，用时 {result.elapsed * 1000:.0f}ms")
+    for binding, error in result.failed:
+        print(f"  {binding.f_key}+{binding.trigger}: {error}")
+    return 1 if result.failed else 0
 
 
 def main():
     """程序入口"""
+    parser = argparse.ArgumentParser(description='PowerKey 功能键快捷方式启动器')
+    command = parser.add_mutually_exclusive_group()
+    command.add_argument('--import', dest='import_path', metavar='清单',
+                         help='从清单（.json/.toml）批量生成快捷方式后退出')
+    command.add_argument('--export', dest='export_path', metavar='清单',
+                         help='将现有快捷方式导出为清单（.json/.toml）后退出')
+    parser.add_argument('--profile', help='导入/导出使用的绑定配置，默认为第一个配置')
+    parser.add_argument('--overwrite', action='store_true', help='导入时覆盖已存在的同名绑定')
+    parser.add_argument('--workers', type=int, help='导入时的并行线程数')
+    parser.add_argument('--memory-report', action='store_true',
+                        help='跟踪内存分配，托盘"导出诊断日志"或退出时按组件写入 memory.txt')
+    args = parser.parse_args()
+
+    if args.import_path or args.export_path:
+        sys.exit(run_manifest_command(args))
+
     app = PowerKey()
     app.run()
 
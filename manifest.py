@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+绑定清单导入/导出
+清单（JSON 或 TOML）列出每个绑定的 F 键、触发键、目标、参数和起始位置；
+导入时并行生成 .lnk/.url 文件，导出时从现有目录树生成清单
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import F_KEYS, TRIGGER_KEYS, MODIFIER_LAYERS
+from shell_link import ShellLink, is_url, read_shortcut, write_shortcut
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+MANIFEST_VERSION = 1
+
+# 清单中每个绑定的字段（导出时按此顺序输出）
+FIELDS = ('f_key', 'layer', 'trigger', 'target', 'arguments', 'working_dir')
+
+# 支持的快捷方式文件扩展名
+LINK_EXTENSIONS = ('.lnk', '.url')
+
+_F_KEY_NAMES = {name.lower(): name for name in F_KEYS.values()}
+
+
+class Binding:
+    """清单中的一个绑定"""
+
+    def __init__(self, f_key: str, trigger: str, target: str, arguments: str = '', working_dir: str = '',
+                 layer: str = ''):
+        self.f_key = f_key
+        self.trigger = trigger
+        self.target = target
+        self.arguments = arguments
+        self.working_dir = working_dir
+        self.layer = layer
+
+    @property
+    def filename(self) -> str:
+        """生成的快捷方式文件名（URL 目标生成 .url，其余生成 .lnk）"""
+        return self.trigger + ('.url' if is_url(self.target) else '.lnk')
+
+    def folder(self, root: str) -> str:
+        """绑定所在文件夹"""
+        if self.layer:
+            return os.path.join(root, self.f_key, self.layer)
+        return os.path.join(root, self.f_key)
+
+    def to_dict(self) -> Dict[str, str]:
+        """转换为清单条目（省略空字段）"""
+        return {name: getattr(self, name) for name in FIELDS if getattr(self, name)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, str]) -> 'Binding':
+        """
+        从清单条目创建绑定
+
+        Raises:
+            ValueError: 字段缺失或无效
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f'绑定必须是表/对象: {data!r}')
+        unknown = set(data) - set(FIELDS)
+        if unknown:
+            raise ValueError(f'未知字段: {", ".join(sorted(unknown))}')
+        values = {}
+        for name in FIELDS:
+            value = data.get(name, '')
+            if not isinstance(value, str):
+                raise ValueError(f'字段 {name} 必须是字符串: {value!r}')
+            values[name] = value.strip()
+
+        f_key = _F_KEY_NAMES.get(values['f_key'].lower())
+        if f_key is None:
+            raise ValueError(f'无效的 F 键: "{values["f_key"]}"')
+        trigger = values['trigger'].lower()
+        if trigger not in TRIGGER_KEYS:
+            raise ValueError(f'无效的触发键: "{values["trigger"]}"（只支持字母和数字）')
+        layer = values['layer']
+        if layer and layer not in MODIFIER_LAYERS.values():
+            raise ValueError(f'未在 MODIFIER_LAYERS 中配置的修饰键层: "{layer}"')
+        if not values['target']:
+            raise ValueError(f'{f_key}+{trigger} 缺少 target')
+        # .url 文件没有参数字段，静默丢弃会使导入/导出往返不一致
+        if values['arguments'] and is_url(values['target']):
+            raise ValueError(f'{f_key}+{trigger} 的 target 是 URL，不支持 arguments')
+        return cls(f_key, trigger, values['target'], values['arguments'], values['working_dir'], layer)
+
+    def __eq__(self, other):
+        return isinstance(other, Binding) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"Binding({self.to_dict()!r})"
+
+
+class ImportResult:
+    """导入结果"""
+
+    def __init__(self):
+        self.written = 0
+        self.skipped = 0  # 已存在且未要求覆盖
+        self.failed: List[Tuple[Binding, str]] = []
+        self.elapsed = 0.0
+
+
+# region 读写清单
+
+def parse_manifest(data: Dict) -> List[Binding]:
+    """
+    解析清单内容
+
+    Raises:
+        ValueError: 格式错误、版本不支持或存在重复绑定
+    """
+    version = data.get('version', MANIFEST_VERSION)
+    if version != MANIFEST_VERSION:
+        raise ValueError(f'不支持的清单版本: {version}')
+    entries = data.get('bindings', [])
+    if not isinstance(entries, list):
+        raise ValueError('bindings 必须是数组')
+
+    bindings = []
+    seen = set()
+    for index, entry in enumerate(entries, 1):
+        try:
+            binding = Binding.from_dict(entry)
+        except ValueError as e:
+            raise ValueError(f'第 {index} 个绑定: {e}')
+        key = (binding.f_key, binding.layer, binding.trigger)
+        if key in seen:
+            raise ValueError(f'第 {index} 个绑定: 重复的绑定 {"/".join(filter(None, key[:2]))}+{binding.trigger}')
+        seen.add(key)
+        bindings.append(binding)
+    return bindings
+
+
+def load_manifest(path: str) -> List[Binding]:
+    """
+    读取清单文件（按扩展名识别 .json / .toml）
+
+    Raises:
+        ValueError: 格式错误或无法读取 TOML
+        OSError: 读取失败
+    """
+    if path.lower().endswith('.toml'):
+        if tomllib is None:
+            raise ValueError('读取 TOML 清单需要 Python 3.11+ 或安装 tomli')
+        with open(path, 'rb') as f:
+            try:
+                data = tomllib.load(f)
+            except tomllib.TOMLDecodeError as e:
+                raise ValueError(f'TOML 格式错误: {e}')
+    else:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f'JSON 格式错误: {e}')
+    if not isinstance(data, dict):
+        raise ValueError('清单顶层必须是表/对象')
+    return parse_manifest(data)
+
+
+def dump_toml(bindings: Iterable[Binding]) -> str:
+    """生成 TOML 清单（JSON 字符串转义对 TOML 基本字符串同样有效）"""
+    lines = [f'version = {MANIFEST_VERSION}']
+    for binding in bindings:
+        lines.append('')
+        lines.append('[[bindings]]')
+        for name, value in binding.to_dict().items():
+            lines.append(f'{name} = {json.dumps(value, ensure_ascii=False)}')
+    return '\n'.join(lines) + '\n'
+
+
+def save_manifest(bindings: Iterable[Binding], path: str):
+    """写入清单文件（按扩展名选择 .json / .toml）"""
+    bindings = list(bindings)
+    if path.lower().endswith('.toml'):
+        text = dump_toml(bindings)
+    else:
+        text = json.dumps(
+            {'version': MANIFEST_VERSION, 'bindings': [b.to_dict() for b in bindings]},
+            ensure_ascii=False, indent=2,
+        ) + '\n'
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+# endregion
+
+
+# region 导入/导出
+
+def _write_binding(root: str, binding: Binding, overwrite: bool) -> bool:
+    """
+    生成单个绑定的快捷方式文件（在线程池中执行）
+
+    Returns:
+        是否写入（已存在且未要求覆盖时返回 False）
+    """
+    folder = binding.folder(root)
+    filename = binding.filename
+    path = os.path.join(folder, filename)
+    # 同一触发键的另一种快捷方式（a.lnk / a.url）会影响查找优先级，覆盖时一并删除
+    others = [os.path.join(folder, binding.trigger + ext) for ext in LINK_EXTENSIONS if not filename.endswith(ext)]
+    if not overwrite and any(os.path.exists(p) for p in (path, *others)):
+        return False
+    write_shortcut(path, ShellLink(binding.target, binding.arguments, binding.working_dir))
+    for other in others:
+        try:
+            os.remove(other)
+        except FileNotFoundError:
+            pass
+    return True
+
+
+def import_bindings(
+    bindings: Iterable[Binding],
+    root: str,
+    overwrite: bool = False,
+    workers: Optional[int] = None,
+) -> ImportResult:
+    """
+    批量生成快捷方式文件
+
+    先创建所有需要的文件夹，再在线程池中并行写入；
+    正在运行的实例由目录变更监听汇集这些变更后刷新缓存和搜索索引
+
+    Args:
+        bindings: 绑定列表
+        root: 快捷方式根目录
+        overwrite: 是否覆盖已存在的同名绑定
+        workers: 并行线程数，默认由线程池决定
+
+    Returns:
+        导入结果
+    """
+    bindings = list(bindings)
+    result = ImportResult()
+    start = time.perf_counter()
+
+    for folder in {binding.folder(root) for binding in bindings}:
+        os.makedirs(folder, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='PowerKey-import') as executor:
+        futures = [(binding, executor.submit(_write_binding, root, binding, overwrite)) for binding in bindings]
+        for binding, future in futures:
+            try:
+                if future.result():
+                    result.written += 1
+                else:
+                    result.skipped += 1
+            except (OSError, ValueError) as e:
+                result.failed.append((binding, str(e)))
+
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def _export_folder(folder: str, f_key: str, layer: str, bindings: List[Binding]):
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return
+    # (触发键, 扩展名优先级, 文件名): 排序后同一触发键的 .lnk 排在 .url 之前，与查找优先级一致（不区分大小写）
+    candidates = []
+    for name in names:
+        trigger, ext = os.path.splitext(name)
+        trigger, ext = trigger.lower(), ext.lower()
+        if trigger in TRIGGER_KEYS and ext in LINK_EXTENSIONS:
+            candidates.append((trigger, LINK_EXTENSIONS.index(ext), name))
+    seen = set()
+    for trigger, _, name in sorted(candidates):
+        # 同一触发键只导出查找时优先的快捷方式
+        if trigger in seen:
+            continue
+        seen.add(trigger)
+        link = read_shortcut(os.path.join(folder, name))
+        if link is not None and link.target:
+            bindings.append(Binding(f_key, trigger, link.target, link.arguments, link.working_dir, layer))
+
+
+def export_bindings(root: str) -> List[Binding]:
+    """
+    从快捷方式目录树生成绑定列表
+
+    只导出以字母/数字命名的 .lnk/.url 文件（含已配置的修饰键层子目录），其他文件忽略
+    """
+    bindings: List[Binding] = []
+    for f_key in F_KEYS.values():
+        folder = os.path.join(root, f_key)
+        _export_folder(folder, f_key, '', bindings)
+        for layer in MODIFIER_LAYERS.values():
+            _export_folder(os.path.join(folder, layer), f_key, layer, bindings)
+    return bindings
+
+# endregion
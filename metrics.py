@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+PowerKey 运行指标
+热路径只做整数自增，指标由独立线程上仅监听本机地址的 HTTP 服务按 Prometheus 文本格式输出
+"""
+
+import threading
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+from thread_roles import start_thread, ROLE_BACKGROUND
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# Prometheus 文本格式的 Content-Type
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# hook 回调耗时的直方图分桶（秒）
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def _format_labels(labels: Dict[str, str], extra: str = '') -> str:
+    parts = [f'{key}="{value}"' for key, value in labels.items()]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+class Counter:
+    """单调递增计数器"""
+
+    __slots__ = ('labels', 'value')
+
+    def __init__(self, labels: Dict[str, str]):
+        self.labels = labels
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def samples(self, name: str) -> List[str]:
+        return [f"{name}{_format_labels(self.labels)} {_format_value(self.value)}"]
+
+
+class FunctionMetric:
+    """抓取时通过回调取值的计数器或仪表"""
+
+    __slots__ = ('labels', 'function')
+
+    def __init__(self, labels: Dict[str, str], function: Callable[[], float]):
+        self.labels = labels
+        self.function = function
+
+    def samples(self, name: str) -> List[str]:
+        try:
+            value = self.function()
+        except Exception:
+            return []
+        return [f"{name}{_format_labels(self.labels)} {_format_value(value)}"]
+
+
+class Histogram:
+    """固定分桶直方图"""
+
+    __slots__ = ('labels', 'bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, labels: Dict[str, str], bounds: Tuple[float, ...]):
+        self.labels = labels
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.bounds, float('inf')), self.counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            bucket_label = f'le="{le}"'
+            lines.append(f"{name}_bucket{_format_labels(self.labels, bucket_label)} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(self.labels)} {repr(self.sum)}")
+        lines.append(f"{name}_count{_format_labels(self.labels)} {self.count}")
+        return lines
+
+
+class Registry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._families: Dict[str, Tuple[str, str, list]] = {}  # 名称 -> (类型, 说明, 指标列表)
+        self._lock = threading.Lock()
+
+    def _add(self, name: str, kind: str, help_text: str, metric):
+        with self._lock:
+            family = self._families.setdefault(name, (kind, help_text, []))
+            family[2].append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, **labels: str) -> Counter:
+        return self._add(name, 'counter', help_text, Counter(labels))
+
+    def function_counter(self, name: str, help_text: str, function: Callable[[], float], **labels: str):
+        return self._add(name, 'counter', help_text, FunctionMetric(labels, function))
+
+    def function_gauge(self, name: str, help_text: str, function: Callable[[], float], **labels: str):
+        return self._add(name, 'gauge', help_text, FunctionMetric(labels, function))
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+                  **labels: str) -> Histogram:
+        return self._add(name, 'histogram', help_text, Histogram(labels, buckets))
+
+    def render(self) -> str:
+        """输出 Prometheus 文本格式"""
+        lines = []
+        with self._lock:
+            families = list(self._families.items())
+        for name, (kind, help_text, children) in families:
+            escaped = help_text.replace('\\', '\\\\').replace('\n', '\\n')
+            lines.append(f"# HELP {name} {escaped}")
+            lines.append(f"# TYPE {name} {kind}")
+            for metric in children:
+                lines.extend(metric.samples(name))
+        return '\n'.join(lines) + '\n'
+
+
+# 全局注册表及热路径使用的指标
+registry = Registry()
+
+dispatched_total = registry.counter('powerkey_dispatched_total', 'Fx 组合键分发次数')
+suppressed_events_total = registry.counter('powerkey_key_events_total', 'hook 处理的按键事件数', action='suppressed')
+passed_events_total = registry.counter('powerkey_key_events_total', 'hook 处理的按键事件数', action='passed')
+launch_failures_total = registry.counter('powerkey_launch_failures_total', '打开文件夹或启动快捷方式失败次数')
+shortcut_misses_total = registry.counter('powerkey_shortcut_misses_total', 'find_shortcut 未找到快捷方式的次数')
+hook_refreshes_total = registry.counter('powerkey_hook_refreshes_total', '重新注册键盘 hook 的次数', reason='heartbeat')
+session_rearms_total = registry.counter('powerkey_hook_refreshes_total', '重新注册键盘 hook 的次数', reason='session')
+stall_rearms_total = registry.counter('powerkey_hook_refreshes_total', '重新注册键盘 hook 的次数', reason='stall')
+remote_launch_timeouts_total = registry.counter('powerkey_remote_launch_timeouts_total', '启动网络共享上的目标超时的次数')
+profile_switches_total = registry.counter('powerkey_profile_switches_total', '切换绑定配置的次数')
+hook_stalls_total = registry.counter('powerkey_hook_stalls_total', 'hook 回调超出时间预算的次数')
+hook_callback_seconds = registry.histogram('powerkey_hook_callback_seconds', 'hook 回调耗时（秒）')
+
+
+def _request_handler_class():
+    """创建请求处理类（http.server 连带导入 ssl、email 等大量模块，只在启用指标服务时导入）"""
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # 静默运行，不输出访问日志
+            pass
+
+    return MetricsRequestHandler
+
+
+class MetricsServer:
+    """仅监听 127.0.0.1 的指标 HTTP 服务，在独立线程中运行"""
+
+    def __init__(self, port: int):
+        self.port = port
+        self._server: Optional['ThreadingHTTPServer'] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """启动指标服务"""
+        if self._server is not None:
+            return
+        from http.server import ThreadingHTTPServer
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.port), _request_handler_class())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = start_thread(self._server.serve_forever, ROLE_BACKGROUND, 'PowerKey-metrics')
+
+    def stop(self):
+        """停止指标服务"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
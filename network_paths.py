@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+网络路径可达性
+将快捷方式目标分为本地和远程（UNC 共享、映射网络驱动器），按共享在后台探测可达性并带 TTL 缓存；
+启动远程目标时只读缓存，已知不可达时立即失败，否则在独立线程中启动并设置硬超时
+"""
+
+import ntpath
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import metrics
+from config import SHARE_REACHABILITY_TTL, SHARE_PROBE_TIMEOUT, REMOTE_LAUNCH_TIMEOUT
+from shell_link import read_shortcut
+from thread_roles import start_thread, ROLE_WORKER, ROLE_BACKGROUND
+
+# GetDriveTypeW 返回值: 网络驱动器
+DRIVE_REMOTE = 4
+
+# 表示网络位置不可用的 Windows 错误码
+NETWORK_ERRORS = {
+    53,  # ERROR_BAD_NETPATH
+    64,  # ERROR_NETNAME_DELETED
+    67,  # ERROR_BAD_NET_NAME
+    1222,  # ERROR_NO_NETWORK
+    1231,  # ERROR_NETWORK_UNREACHABLE
+    1232,  # ERROR_HOST_UNREACHABLE
+}
+
+
+class ShareUnreachableError(OSError):
+    """网络共享不可达或启动超时"""
+
+
+def _is_remote_drive(drive: str) -> bool:
+    """盘符是否为映射网络驱动器（GetDriveTypeW 只查询本机映射表，不访问网络）"""
+    if sys.platform != 'win32':
+        return False
+    import ctypes
+    return ctypes.windll.kernel32.GetDriveTypeW(drive + '\\') == DRIVE_REMOTE
+
+
+def network_share(path: str) -> Optional[str]:
+    """
+    获取路径所在的网络共享
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        UNC 路径返回 '\\\\server\\share'，映射网络驱动器返回 'z:'（均为小写），本地路径返回 None
+    """
+    if not path:
+        return None
+    if path[:8].upper() == '\\\\?\\UNC\\':
+        path = '\\\\' + path[8:]
+    drive = ntpath.splitdrive(path)[0]
+    if drive[:2] in ('\\\\', '//'):
+        if drive[2:3] in ('?', '.'):
+            return None  # 本机设备路径
+        return drive.replace('/', '\\').lower()
+    if len(drive) == 2 and drive[1] == ':' and _is_remote_drive(drive):
+        return drive.lower()
+    return None
+
+
+def resolve_target(path: str) -> str:
+    """获取快捷方式的目标路径（非快捷方式或无法解析时返回原路径）"""
+    link = read_shortcut(path)
+    if link is not None and link.target:
+        return link.target
+    return path
+
+
+class ShareState:
+    """单个共享的可达性缓存"""
+
+    __slots__ = ('reachable', 'checked', 'probe_started')
+
+    def __init__(self):
+        self.reachable: Optional[bool] = None  # None 表示尚未探测
+        self.checked = float('-inf')  # 最后一次得出结论的单调时间
+        self.probe_started = 0.0  # 进行中探测的开始时间，0 表示未在探测
+
+
+class ShareMonitor:
+    """
+    网络共享可达性监视器
+
+    is_reachable 只读缓存并按需安排后台探测，从不等待网络 I/O；
+    每个共享同时最多一个探测线程，探测超时即视为不可达
+    """
+
+    def __init__(self, ttl: float = SHARE_REACHABILITY_TTL, probe_timeout: float = SHARE_PROBE_TIMEOUT,
+                 launch_timeout: float = REMOTE_LAUNCH_TIMEOUT):
+        self.ttl = ttl
+        self.probe_timeout = probe_timeout
+        self.launch_timeout = launch_timeout
+        self._states: Dict[str, ShareState] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str, str], None]] = []
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_listener(self, callback: Callable[[str, str], None]):
+        """注册远程启动失败回调，参数为 (共享, 原因)"""
+        self._listeners.append(callback)
+
+    def shares(self) -> Dict[str, Optional[bool]]:
+        """当前已知共享及其可达性"""
+        with self._lock:
+            return {share: state.reachable for share, state in self._states.items()}
+
+    def is_reachable(self, share: str) -> Optional[bool]:
+        """
+        读取共享可达性（不阻塞）
+
+        缓存过期或未知时安排后台探测；探测超过 probe_timeout 仍未返回视为不可达
+
+        Returns:
+            True/False，尚无结论时返回 None
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._states.get(share)
+            if state is None:
+                state = self._states[share] = ShareState()
+            if state.probe_started:
+                if now - state.probe_started >= self.probe_timeout:
+                    state.reachable = False
+                    state.checked = now
+                return state.reachable
+            if now - state.checked >= self.ttl:
+                state.probe_started = now
+                start_thread(self._probe, ROLE_BACKGROUND, 'PowerKey-probe', share)
+            return state.reachable
+
+    def _probe(self, share: str):
+        """探测共享根目录（在探测线程中执行，可能长时间阻塞）"""
+        try:
+            reachable = os.path.isdir(share + '\\')
+        except OSError:
+            reachable = False
+        with self._lock:
+            state = self._states[share]
+            state.reachable = reachable
+            state.checked = time.monotonic()
+            state.probe_started = 0.0
+
+    def _set_reachable(self, share: str, reachable: bool):
+        with self._lock:
+            state = self._states.setdefault(share, ShareState())
+            state.reachable = reachable
+            state.checked = time.monotonic()
+
+    def _fail(self, share: str, reason: str):
+        for callback in self._listeners:
+            try:
+                callback(share, reason)
+            except Exception:
+                pass
+        raise ShareUnreachableError(f"{share} {reason}")
+
+    def launch(self, share: str, function: Callable, *args):
+        """
+        启动远程目标（在调用方线程中最多等待 launch_timeout 秒）
+
+        Args:
+            share: 目标所在的网络共享
+            function: 实际执行启动的函数，如 os.startfile
+            *args: 传给 function 的参数
+
+        Raises:
+            ShareUnreachableError: 共享已知不可达或启动超时
+            OSError: 启动失败
+        """
+        if self.is_reachable(share) is False:
+            self._fail(share, '不可达')
+
+        done = threading.Event()
+        outcome: List[Optional[BaseException]] = [None]
+
+        def run():
+            try:
+                function(*args)
+                self._set_reachable(share, True)
+            except OSError as e:
+                outcome[0] = e
+                if getattr(e, 'winerror', None) in NETWORK_ERRORS:
+                    self._set_reachable(share, False)
+            except Exception as e:
+                outcome[0] = e
+            done.set()
+
+        start_thread(run, ROLE_WORKER, 'PowerKey-remote-launch')
+        if not done.wait(self.launch_timeout):
+            # 超时的启动线程无法中止，在其返回前该共享按不可达处理，后续启动立即失败
+            self._set_reachable(share, False)
+            metrics.remote_launch_timeouts_total.inc()
+            self._fail(share, '启动超时')
+        error = outcome[0]
+        if error is not None:
+            if getattr(error, 'winerror', None) in NETWORK_ERRORS:
+                self._fail(share, '不可达')
+            raise error
+
+    def prewarm(self, roots: Iterable[str]):
+        """扫描快捷方式目录，登记所有远程目标所在的共享并开始探测"""
+        for root in roots:
+            for folder, _, files in os.walk(root):
+                for name in files:
+                    share = network_share(resolve_target(os.path.join(folder, name)))
+                    if share is not None:
+                        self.is_reachable(share)
+
+    def _run(self, roots: List[str]):
+        """后台线程: 预热后定期刷新已知共享的可达性"""
+        try:
+            self.prewarm(roots)
+        except Exception:
+            pass
+        while not self._stop_event.wait(self.ttl):
+            for share in list(self.shares()):
+                self.is_reachable(share)
+
+    def start(self, roots: Iterable[str]):
+        """启动后台探测线程（roots 为需要预热的快捷方式根目录）"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = start_thread(self._run, ROLE_BACKGROUND, 'PowerKey-shares', list(roots))
+
+    def stop(self):
+        """停止后台探测线程"""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=1)
+
+
+# 全局共享监视器
+share_monitor = ShareMonitor()
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+快捷方式搜索索引
+按文件名和快捷方式目标名建立 n-gram / 前缀倒排索引，
+目录变更时只增量同步发生变化的文件夹，查询时不扫描目录
+"""
+
+import itertools
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+from shell_link import read_shortcut
+from thread_roles import start_thread, ROLE_BACKGROUND
+
+# n-gram 长度，更短的查询走前缀索引
+GRAM_SIZE = 3
+
+# 词条开头前缀的最大索引长度（"以查询开头"的结果排在前面）
+MAX_START = 8
+
+_WORD_SPLIT = re.compile(r'[\s_\-.()\[\]]+')
+
+
+class SearchEntry:
+    """索引中的一个快捷方式"""
+
+    __slots__ = ('path', 'f_key', 'layer', 'name', 'target', 'terms')
+
+    def __init__(self, path: str, f_key: str, layer: str, target: str):
+        self.path = path
+        self.f_key = f_key
+        self.layer = layer
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self.target = target
+        target_name = os.path.splitext(os.path.basename(target.rstrip('/\\')))[0] if target else ''
+        self.terms = tuple(t for t in {self.name.lower(), target_name.lower()} if t)
+
+    @property
+    def binding(self) -> str:
+        """组合键描述，如 F1+a 或 F1/shift+a"""
+        folder = f"{self.f_key}/{self.layer}" if self.layer else self.f_key
+        return f"{folder}+{self.name}"
+
+    @property
+    def display_name(self) -> str:
+        """展示名称: 优先使用目标名"""
+        if self.target:
+            return os.path.splitext(os.path.basename(self.target.rstrip('/\\')))[0] or self.target
+        return self.name
+
+
+def _grams(term: str) -> Set[str]:
+    """生成词条的全部 n-gram"""
+    return {term[i:i + GRAM_SIZE] for i in range(len(term) - GRAM_SIZE + 1)}
+
+
+def _starts(term: str) -> Set[str]:
+    """生成词条开头长度 1..MAX_START 的前缀"""
+    return {term[:size] for size in range(1, min(len(term), MAX_START) + 1)}
+
+
+def _prefixes(term: str) -> Set[str]:
+    """生成词条及其中每个单词长度小于 GRAM_SIZE 的前缀"""
+    prefixes = set()
+    for word in [term, *_WORD_SPLIT.split(term)]:
+        for size in range(1, GRAM_SIZE):
+            if len(word) >= size:
+                prefixes.add(word[:size])
+    return prefixes
+
+
+class SearchIndex:
+    """
+    快捷方式搜索索引
+
+    写入（构建、增量同步）在后台线程进行并由 _sync_lock 串行化，
+    查询在启动器线程进行，与写入通过 _lock 互斥；键盘 hook 线程不会访问索引
+
+    条目编号 = 展示名长度 << 32 | 序号，倒排表中的编号排序后即为静态相关度顺序，
+    查询时只需对候选编号做一次整数排序并按序校验，直到取满结果
+    """
+
+    def __init__(self, root: str, f_keys: Iterable[str]):
+        self.root = root
+        self.f_keys = set(f_keys)
+        self._entries: Dict[int, SearchEntry] = {}
+        self._ids: Dict[str, int] = {}  # 路径 -> 条目编号
+        self._folders: Dict[str, Set[str]] = {}  # 文件夹 -> 已索引的路径
+        self._grams: Dict[str, Set[int]] = defaultdict(set)
+        self._prefixes: Dict[str, Set[int]] = defaultdict(set)
+        self._starts: Dict[str, Set[int]] = defaultdict(set)
+        self._next_id = itertools.count(1)
+        self._lock = threading.Lock()
+        self._sync_lock = threading.RLock()
+        self.build_time: float = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # region 写入
+
+    def add(self, path: str, f_key: str, layer: str = '', target: str = ''):
+        """添加或替换一个条目"""
+        entry = SearchEntry(path, f_key, layer, target)
+        with self._lock:
+            self._remove_locked(path)
+            entry_id = (len(entry.display_name) << 32) | next(self._next_id)
+            self._entries[entry_id] = entry
+            self._ids[path] = entry_id
+            self._folders.setdefault(os.path.dirname(path), set()).add(path)
+            for term in entry.terms:
+                for gram in _grams(term):
+                    self._grams[gram].add(entry_id)
+                for prefix in _prefixes(term):
+                    self._prefixes[prefix].add(entry_id)
+                for prefix in _starts(term):
+                    self._starts[prefix].add(entry_id)
+
+    def remove(self, path: str):
+        """移除一个条目"""
+        with self._lock:
+            self._remove_locked(path)
+
+    def _remove_locked(self, path: str):
+        entry_id = self._ids.pop(path, None)
+        if entry_id is None:
+            return
+        entry = self._entries.pop(entry_id)
+        paths = self._folders.get(os.path.dirname(path))
+        if paths is not None:
+            paths.discard(path)
+        for term in entry.terms:
+            for index, keys in (
+                (self._grams, _grams(term)),
+                (self._prefixes, _prefixes(term)),
+                (self._starts, _starts(term)),
+            ):
+                for key in keys:
+                    ids = index.get(key)
+                    if ids is not None:
+                        ids.discard(entry_id)
+                        if not ids:
+                            del index[key]
+
+    def _locate(self, folder: str):
+        """返回文件夹对应的 (F键, 子目录)，不属于任何F键文件夹时返回 None"""
+        rel = os.path.relpath(folder, self.root)
+        parts = rel.split(os.sep)
+        if parts[0] not in self.f_keys or len(parts) > 2:
+            return None
+        return parts[0], parts[1] if len(parts) == 2 else ''
+
+    def sync_folder(self, folder: str):
+        """将单个文件夹与磁盘同步（只处理新增和删除的文件）"""
+        location = self._locate(folder)
+        if location is None:
+            return
+        f_key, layer = location
+        with self._sync_lock:
+            current = set()
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        if entry.is_file():
+                            current.add(entry.path)
+            except OSError:
+                # 文件夹已被删除，连同其子目录一起移除
+                prefix = folder + os.sep
+                for known in [f for f in self._folders if f == folder or f.startswith(prefix)]:
+                    for path in list(self._folders.get(known, ())):
+                        self.remove(path)
+                return
+
+            known = self._folders.get(folder, set())
+            for path in known - current:
+                self.remove(path)
+            for path in current - known:
+                link = read_shortcut(path)
+                self.add(path, f_key, layer, link.target if link else '')
+
+    def build(self):
+        """全量构建索引（F键文件夹及其修饰键层子目录）"""
+        start = time.perf_counter()
+        with self._sync_lock:
+            with self._lock:
+                self._entries.clear()
+                self._ids.clear()
+                self._folders.clear()
+                self._grams.clear()
+                self._prefixes.clear()
+                self._starts.clear()
+            for f_key in sorted(self.f_keys):
+                folder = os.path.join(self.root, f_key)
+                self.sync_folder(folder)
+                try:
+                    with os.scandir(folder) as it:
+                        layers = [entry.path for entry in it if entry.is_dir()]
+                except OSError:
+                    continue
+                for layer_folder in layers:
+                    self.sync_folder(layer_folder)
+        self.build_time = time.perf_counter() - start
+
+    def build_async(self, on_done=None):
+        """在后台线程构建索引"""
+        def run():
+            self.build()
+            if on_done:
+                on_done(self)
+
+        start_thread(run, ROLE_BACKGROUND, 'PowerKey-index')
+
+    def on_change(self, path: str):
+        """目录变更回调（由目录监听线程调用，path 为发生变化的目录）"""
+        if os.path.normcase(path) == os.path.normcase(self.root):
+            self.build()
+            return
+        with self._sync_lock:
+            if path in self._folders or os.path.isdir(path):
+                self.sync_folder(path)
+            # 被删除的子目录只通过父目录的变更通知体现
+            prefix = path + os.sep
+            for folder in [f for f in self._folders if f.startswith(prefix) and not os.path.isdir(f)]:
+                self.sync_folder(folder)
+
+    # endregion
+
+    def search(self, query: str, limit: int = 10) -> List[SearchEntry]:
+        """
+        按文件名或目标名搜索
+
+        Args:
+            query: 查询文本（不区分大小写，子串匹配；少于 3 个字符时按单词前缀匹配）
+            limit: 最多返回的结果数
+
+        Returns:
+            按相关度排序的结果
+        """
+        q = query.strip().lower()
+        if not q:
+            return []
+        results: List[SearchEntry] = []
+        with self._lock:
+            # 第一档: 文件名或目标名以查询开头
+            starts = self._starts.get(q[:MAX_START], set())
+            for entry_id in sorted(starts):
+                entry = self._entries[entry_id]
+                if any(term.startswith(q) for term in entry.terms):
+                    results.append(entry)
+                    if len(results) >= limit:
+                        return results
+
+            # 第二档: 单词前缀（短查询）或子串（n-gram 候选再校验）
+            if len(q) < GRAM_SIZE:
+                candidates: Optional[Set[int]] = self._prefixes.get(q)
+                if not candidates:
+                    return results
+            else:
+                postings = []
+                for gram in _grams(q):
+                    ids = self._grams.get(gram)
+                    if not ids:
+                        return results
+                    postings.append(ids)
+                postings.sort(key=len)
+                candidates = postings[0].intersection(*postings[1:])
+            for entry_id in sorted(candidates - starts):
+                entry = self._entries[entry_id]
+                if any(q in term for term in entry.terms):
+                    results.append(entry)
+                    if len(results) >= limit:
+                        break
+        return results
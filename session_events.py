@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+会话与电源事件
+键盘钩子最容易被系统移除的时机是从睡眠恢复、锁屏后解锁和远程桌面重连，
+订阅这些事件后由监听者立即重新注册 hook，心跳定时刷新只作为长间隔的兜底
+"""
+
+import sys
+import threading
+from typing import Callable, List, Optional
+
+from thread_roles import start_thread, ROLE_BACKGROUND
+
+# 事件名称（传给监听者）
+EVENT_CONSOLE_CONNECT = 'console_connect'
+EVENT_REMOTE_CONNECT = 'remote_connect'
+EVENT_LOGON = 'logon'
+EVENT_UNLOCK = 'unlock'
+EVENT_RESUME = 'resume'
+
+# Windows 消息
+WM_DESTROY = 0x0002
+WM_CLOSE = 0x0010
+WM_POWERBROADCAST = 0x0218
+WM_WTSSESSION_CHANGE = 0x02B1
+
+NOTIFY_FOR_THIS_SESSION = 0
+
+# WM_WTSSESSION_CHANGE 的 wParam -> 事件
+SESSION_EVENTS = {
+    0x1: EVENT_CONSOLE_CONNECT,  # WTS_CONSOLE_CONNECT
+    0x3: EVENT_REMOTE_CONNECT,  # WTS_REMOTE_CONNECT
+    0x5: EVENT_LOGON,  # WTS_SESSION_LOGON
+    0x8: EVENT_UNLOCK,  # WTS_SESSION_UNLOCK
+}
+
+# WM_POWERBROADCAST 的 wParam -> 事件（恢复时两者通常先后到达，由监听者合并）
+POWER_EVENTS = {
+    0x7: EVENT_RESUME,  # PBT_APMRESUMESUSPEND
+    0x12: EVENT_RESUME,  # PBT_APMRESUMEAUTOMATIC
+}
+
+
+class SessionEventSource:
+    """
+    会话/电源事件源
+
+    默认实现不产生任何事件（非 Windows 平台）；监听者在事件源线程中被调用，参数为事件名称
+    """
+
+    def __init__(self):
+        self._listeners: List[Callable[[str], None]] = []
+
+    def add_listener(self, callback: Callable[[str], None]):
+        """注册事件回调"""
+        self._listeners.append(callback)
+
+    def _emit(self, event: str):
+        for callback in self._listeners:
+            try:
+                callback(event)
+            except Exception:
+                pass
+
+    def start(self) -> bool:
+        """
+        开始订阅事件
+
+        Returns:
+            是否订阅成功（失败时只能依靠心跳兜底）
+        """
+        return False
+
+    def stop(self):
+        """停止订阅事件"""
+
+
+class WindowsSessionEventSource(SessionEventSource):
+    """
+    通过隐藏窗口接收 WM_WTSSESSION_CHANGE 和 WM_POWERBROADCAST
+
+    WM_POWERBROADCAST 只广播给顶层窗口，因此使用不可见的顶层窗口而不是 message-only 窗口；
+    窗口的创建、消息循环和销毁都在同一个后台线程中完成
+    """
+
+    CLASS_NAME = 'PowerKeySessionEvents'
+
+    def __init__(self):
+        super().__init__()
+        self._hwnd = None
+        self._wndproc = None  # 保持回调引用，避免被回收
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        if self._thread is not None and self._thread.is_alive():
+            return self._hwnd is not None
+        self._ready.clear()
+        self._thread = start_thread(self._run, ROLE_BACKGROUND, 'PowerKey-session-events')
+        self._ready.wait(timeout=2)
+        return self._hwnd is not None
+
+    def stop(self):
+        if self._hwnd is not None:
+            import ctypes
+            ctypes.windll.user32.PostMessageW(self._hwnd, WM_CLOSE, 0, 0)
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=1)
+
+    def _run(self):
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = ctypes.WinDLL('user32', use_last_error=True)
+        wtsapi32 = ctypes.WinDLL('wtsapi32')
+        kernel32 = ctypes.WinDLL('kernel32')
+
+        LRESULT = ctypes.c_ssize_t
+        WNDPROC = ctypes.WINFUNCTYPE(LRESULT, wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM)
+
+        class WNDCLASSW(ctypes.Structure):
+            _fields_ = [
+                ('style', wintypes.UINT),
+                ('lpfnWndProc', WNDPROC),
+                ('cbClsExtra', ctypes.c_int),
+                ('cbWndExtra', ctypes.c_int),
+                ('hInstance', wintypes.HINSTANCE),
+                ('hIcon', wintypes.HICON),
+                ('hCursor', wintypes.HANDLE),
+                ('hbrBackground', wintypes.HBRUSH),
+                ('lpszMenuName', wintypes.LPCWSTR),
+                ('lpszClassName', wintypes.LPCWSTR),
+            ]
+
+        user32.DefWindowProcW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+        user32.DefWindowProcW.restype = LRESULT
+        user32.CreateWindowExW.argtypes = [
+            wintypes.DWORD, wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD,
+            ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+            wintypes.HWND, wintypes.HMENU, wintypes.HINSTANCE, wintypes.LPVOID,
+        ]
+        user32.CreateWindowExW.restype = wintypes.HWND
+        user32.RegisterClassW.argtypes = [ctypes.POINTER(WNDCLASSW)]
+        user32.RegisterClassW.restype = wintypes.ATOM
+        user32.UnregisterClassW.argtypes = [wintypes.LPCWSTR, wintypes.HINSTANCE]
+        user32.GetMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT]
+        user32.DispatchMessageW.argtypes = [ctypes.POINTER(wintypes.MSG)]
+        user32.TranslateMessage.argtypes = [ctypes.POINTER(wintypes.MSG)]
+        user32.DestroyWindow.argtypes = [wintypes.HWND]
+        kernel32.GetModuleHandleW.argtypes = [wintypes.LPCWSTR]
+        kernel32.GetModuleHandleW.restype = wintypes.HMODULE
+        wtsapi32.WTSRegisterSessionNotification.argtypes = [wintypes.HWND, wintypes.DWORD]
+        wtsapi32.WTSUnRegisterSessionNotification.argtypes = [wintypes.HWND]
+
+        def wndproc(hwnd, msg, wparam, lparam):
+            if msg == WM_WTSSESSION_CHANGE:
+                event = SESSION_EVENTS.get(wparam)
+                if event is not None:
+                    self._emit(event)
+                return 0
+            if msg == WM_POWERBROADCAST:
+                event = POWER_EVENTS.get(wparam)
+                if event is not None:
+                    self._emit(event)
+                return 1
+            if msg == WM_CLOSE:
+                user32.DestroyWindow(hwnd)
+                return 0
+            if msg == WM_DESTROY:
+                wtsapi32.WTSUnRegisterSessionNotification(hwnd)
+                user32.PostQuitMessage(0)
+                return 0
+            return user32.DefWindowProcW(hwnd, msg, wparam, lparam)
+
+        self._wndproc = WNDPROC(wndproc)
+        instance = kernel32.GetModuleHandleW(None)
+        window_class = WNDCLASSW()
+        window_class.lpfnWndProc = self._wndproc
+        window_class.hInstance = instance
+        window_class.lpszClassName = self.CLASS_NAME
+
+        try:
+            registered = user32.RegisterClassW(ctypes.byref(window_class))
+            hwnd = user32.CreateWindowExW(0, self.CLASS_NAME, 'PowerKey', 0, 0, 0, 0, 0, None, None, instance, None)
+            if not hwnd:
+                if registered:
+                    user32.UnregisterClassW(self.CLASS_NAME, instance)
+                return
+            # 会话通知注册失败时（如终端服务未运行）仍可接收电源事件
+            wtsapi32.WTSRegisterSessionNotification(hwnd, NOTIFY_FOR_THIS_SESSION)
+            self._hwnd = hwnd
+        finally:
+            self._ready.set()
+
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+        self._hwnd = None
+        user32.UnregisterClassW(self.CLASS_NAME, instance)
+
+
+def create_session_event_source() -> SessionEventSource:
+    """创建当前平台的会话/电源事件源"""
+    if sys.platform == 'win32':
+        return WindowsSessionEventSource()
+    return SessionEventSource()
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+Shell Link (.lnk) 与 Internet 快捷方式 (.url) 解析与生成
+纯 Python 实现 MS-SHLLINK 格式中 PowerKey 需要的部分，不依赖 COM，可在任意平台运行
+"""
+
+import os
+import re
+import struct
+from typing import Optional
+
+# ShellLinkHeader
+HEADER_SIZE = 0x4C
+LINK_CLSID = bytes.fromhex('0114020000000000c000000000000046')
+
+# LinkFlags
+HAS_LINK_TARGET_ID_LIST = 0x00000001
+HAS_LINK_INFO = 0x00000002
+HAS_NAME = 0x00000004
+HAS_RELATIVE_PATH = 0x00000008
+HAS_WORKING_DIR = 0x00000010
+HAS_ARGUMENTS = 0x00000020
+HAS_ICON_LOCATION = 0x00000040
+IS_UNICODE = 0x00000080
+
+# LinkInfoFlags
+VOLUME_ID_AND_LOCAL_BASE_PATH = 0x00000001
+COMMON_NETWORK_RELATIVE_LINK_AND_PATH_SUFFIX = 0x00000002
+
+# 生成 .lnk 时使用的值
+LINK_INFO_HEADER_SIZE = 0x24  # 含 Unicode 路径偏移
+NETWORK_LINK_HEADER_SIZE = 0x1C  # 含 Unicode 网络名偏移
+DRIVE_FIXED = 3
+SW_SHOWNORMAL = 1
+
+# URL 形式的目标（协议名至少两个字符，以区分盘符）
+URL_PATTERN = re.compile(r'^[A-Za-z][A-Za-z0-9+.-]+:')
+
+
+class ShellLink:
+    """快捷方式内容"""
+
+    def __init__(self, target: str = '', arguments: str = '', working_dir: str = ''):
+        self.target = target
+        self.arguments = arguments
+        self.working_dir = working_dir
+
+    def __repr__(self):
+        return f"ShellLink(target={self.target!r}, arguments={self.arguments!r}, working_dir={self.working_dir!r})"
+
+
+def _read_cstring(data: bytes, offset: int, unicode: bool = False) -> str:
+    """读取以 NUL 结尾的字符串"""
+    if unicode:
+        end = offset
+        while end + 1 < len(data) and data[end:end + 2] != b'\x00\x00':
+            end += 2
+        return data[offset:end].decode('utf-16-le', errors='replace')
+    end = data.find(b'\x00', offset)
+    if end < 0:
+        end = len(data)
+    return data[offset:end].decode('mbcs' if os.name == 'nt' else 'latin-1', errors='replace')
+
+
+def _parse_link_info(data: bytes) -> str:
+    """从 LinkInfo 结构中解析目标路径"""
+    header_size, flags = struct.unpack_from('<II', data, 4)
+    local_offset, network_offset, suffix_offset = struct.unpack_from('<III', data, 16)
+    unicode_local = unicode_suffix = 0
+    if header_size >= 0x24:
+        unicode_local, unicode_suffix = struct.unpack_from('<II', data, 28)
+
+    if flags & VOLUME_ID_AND_LOCAL_BASE_PATH:
+        if unicode_local:
+            base = _read_cstring(data, unicode_local, unicode=True)
+        else:
+            base = _read_cstring(data, local_offset)
+    elif flags & COMMON_NETWORK_RELATIVE_LINK_AND_PATH_SUFFIX:
+        net_name_offset = struct.unpack_from('<I', data, network_offset + 8)[0]
+        if net_name_offset > 0x14:
+            unicode_net = struct.unpack_from('<I', data, network_offset + 20)[0]
+            base = _read_cstring(data, network_offset + unicode_net, unicode=True)
+        else:
+            base = _read_cstring(data, network_offset + net_name_offset)
+    else:
+        return ''
+
+    if unicode_suffix:
+        suffix = _read_cstring(data, unicode_suffix, unicode=True)
+    else:
+        suffix = _read_cstring(data, suffix_offset)
+    if suffix:
+        return base.rstrip('\\') + '\\' + suffix
+    return base
+
+
+def parse_link(data: bytes, link_dir: str = '') -> ShellLink:
+    """
+    解析 .lnk 文件内容
+
+    Args:
+        data: 文件内容
+        link_dir: 快捷方式所在目录，用于解析相对路径
+
+    Returns:
+        快捷方式内容
+
+    Raises:
+        ValueError: 不是有效的 Shell Link 文件
+    """
+    if len(data) < HEADER_SIZE or struct.unpack_from('<I', data, 0)[0] != HEADER_SIZE \
+            or data[4:20] != LINK_CLSID:
+        raise ValueError('不是有效的 Shell Link 文件')
+    try:
+        flags = struct.unpack_from('<I', data, 0x14)[0]
+        offset = HEADER_SIZE
+
+        if flags & HAS_LINK_TARGET_ID_LIST:
+            offset += 2 + struct.unpack_from('<H', data, offset)[0]
+
+        target = ''
+        if flags & HAS_LINK_INFO:
+            link_info_size = struct.unpack_from('<I', data, offset)[0]
+            target = _parse_link_info(data[offset:offset + link_info_size])
+            offset += link_info_size
+
+        unicode = bool(flags & IS_UNICODE)
+        strings = {}
+        for flag in (HAS_NAME, HAS_RELATIVE_PATH, HAS_WORKING_DIR, HAS_ARGUMENTS, HAS_ICON_LOCATION):
+            if not flags & flag:
+                continue
+            count = struct.unpack_from('<H', data, offset)[0]
+            offset += 2
+            size = count * 2 if unicode else count
+            raw = data[offset:offset + size]
+            strings[flag] = raw.decode('utf-16-le', errors='replace') if unicode else raw.decode('latin-1')
+            offset += size
+    except struct.error as e:
+        raise ValueError(f'Shell Link 文件已损坏: {e}')
+
+    if not target and HAS_RELATIVE_PATH in strings:
+        target = os.path.normpath(os.path.join(link_dir, strings[HAS_RELATIVE_PATH]))
+    return ShellLink(target, strings.get(HAS_ARGUMENTS, ''), strings.get(HAS_WORKING_DIR, ''))
+
+
+def parse_url_shortcut(text: str) -> ShellLink:
+    """解析 .url 文件内容（[InternetShortcut] 段的 URL 与 WorkingDirectory）"""
+    link = ShellLink()
+    in_section = False
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith('['):
+            in_section = line.lower() == '[internetshortcut]'
+        elif in_section and '=' in line:
+            key, value = line.split('=', 1)
+            key = key.strip().lower()
+            if key == 'url':
+                link.target = value.strip()
+            elif key == 'workingdirectory':
+                link.working_dir = value.strip()
+    return link
+
+
+def read_shortcut(path: str) -> Optional[ShellLink]:
+    """
+    读取快捷方式文件
+
+    Args:
+        path: .lnk 或 .url 文件路径
+
+    Returns:
+        快捷方式内容，非快捷方式或无法解析时返回 None
+    """
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        if ext == '.lnk':
+            with open(path, 'rb') as f:
+                return parse_link(f.read(), os.path.dirname(path))
+        if ext == '.url':
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                return parse_url_shortcut(f.read())
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def is_url(target: str) -> bool:
+    """目标是否为 URL（生成 .url 而不是 .lnk）"""
+    return bool(URL_PATTERN.match(target))
+
+
+def _ansi(text: str) -> bytes:
+    return text.encode('mbcs' if os.name == 'nt' else 'latin-1', errors='replace') + b'\x00'
+
+
+def _utf16(text: str) -> bytes:
+    return text.encode('utf-16-le') + b'\x00\x00'
+
+
+def _build_link_info(target: str) -> bytes:
+    """生成 LinkInfo 结构（本地路径使用 VolumeID + LocalBasePath，UNC 路径使用 CommonNetworkRelativeLink）"""
+    blocks = []
+    offset = LINK_INFO_HEADER_SIZE
+
+    def add(block: bytes) -> int:
+        nonlocal offset
+        start = offset
+        blocks.append(block)
+        offset += len(block)
+        return start
+
+    if target.startswith('\\\\'):
+        server, _, rest = target[2:].partition('\\')
+        share, _, suffix = rest.partition('\\')
+        net_name = f'\\\\{server}\\{share}'
+        net_names = _ansi(net_name) + _utf16(net_name)
+        network = struct.pack(
+            '<7I',
+            NETWORK_LINK_HEADER_SIZE + len(net_names),
+            0,  # 不设置 ValidDevice/ValidNetType
+            NETWORK_LINK_HEADER_SIZE, 0, 0,
+            NETWORK_LINK_HEADER_SIZE + len(_ansi(net_name)), 0,
+        ) + net_names
+        flags = COMMON_NETWORK_RELATIVE_LINK_AND_PATH_SUFFIX
+        volume_offset = local_offset = local_unicode_offset = 0
+        network_offset = add(network)
+    else:
+        volume = struct.pack('<4I', 0x11, DRIVE_FIXED, 0, 0x10) + b'\x00'
+        flags = VOLUME_ID_AND_LOCAL_BASE_PATH
+        network_offset = 0
+        suffix = ''
+        volume_offset = add(volume)
+        local_offset = add(_ansi(target))
+    suffix_offset = add(_ansi(suffix))
+    if flags & VOLUME_ID_AND_LOCAL_BASE_PATH:
+        local_unicode_offset = add(_utf16(target))
+    suffix_unicode_offset = add(_utf16(suffix))
+
+    header = struct.pack(
+        '<9I', offset, LINK_INFO_HEADER_SIZE, flags, volume_offset, local_offset,
+        network_offset, suffix_offset, local_unicode_offset, suffix_unicode_offset,
+    )
+    return header + b''.join(blocks)
+
+
+def build_link(link: ShellLink) -> bytes:
+    """
+    生成 .lnk 文件内容（不含 IDList，由 LinkInfo 定位目标，字符串使用 Unicode）
+
+    Args:
+        link: 快捷方式内容，target 必须是绝对路径（盘符路径或 UNC 路径）
+
+    Raises:
+        ValueError: 目标不是绝对路径或字符串过长
+    """
+    target = link.target.replace('/', '\\')
+    if not (target.startswith('\\\\') or re.match(r'^[A-Za-z]:\\', target)):
+        raise ValueError(f'快捷方式目标必须是绝对路径: {link.target}')
+
+    flags = HAS_LINK_INFO | IS_UNICODE
+    strings = b''
+    for flag, value in ((HAS_WORKING_DIR, link.working_dir), (HAS_ARGUMENTS, link.arguments)):
+        if not value:
+            continue
+        encoded = value.encode('utf-16-le')
+        if len(encoded) // 2 > 0xFFFF:
+            raise ValueError('快捷方式参数或起始位置过长')
+        flags |= flag
+        strings += struct.pack('<H', len(encoded) // 2) + encoded
+
+    header = struct.pack(
+        '<I16sII24sIiIHHII', HEADER_SIZE, LINK_CLSID, flags, 0, b'\x00' * 24, 0, 0, SW_SHOWNORMAL, 0, 0, 0, 0,
+    )
+    return header + _build_link_info(target) + strings + b'\x00\x00\x00\x00'  # TerminalBlock
+
+
+def build_url_shortcut(link: ShellLink) -> str:
+    """生成 .url 文件内容"""
+    lines = ['[InternetShortcut]', f'URL={link.target}']
+    if link.working_dir:
+        lines.append(f'WorkingDirectory={link.working_dir}')
+    return '\r\n'.join(lines) + '\r\n'
+
+
+def write_shortcut(path: str, link: ShellLink):
+    """
+    写入快捷方式文件（按扩展名生成 .lnk 或 .url）
+
+    Raises:
+        ValueError: 扩展名不受支持或内容无效
+        OSError: 写入失败
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.lnk':
+        data = build_link(link)
+        with open(path, 'wb') as f:
+            f.write(data)
+    elif ext == '.url':
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(build_url_shortcut(link))
+    else:
+        raise ValueError(f'不支持的快捷方式类型: {path}')
@@ -6,115 +6,322 @@ PowerKey 快捷方式管理模块
 
 import os
 import subprocess
-from config import BASE_PATH
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from config import BASE_PATH, F_KEYS, MODIFIER_LAYERS, PROFILES
+from event_log import record, EV_OPEN_FOLDER_FAILED, EV_LAUNCH_FAILED
+from folder_watcher import FolderWatcher
+from network_paths import network_share, resolve_target, share_monitor
+import metrics
 
+# 支持的快捷方式扩展名（按查找优先级排列）
+SHORTCUT_EXTENSIONS = ['.lnk', '.url', '']
 
-def get_folder_path(f_key: str) -> str:
+
+class FolderCache:
+    """
+    F键文件夹缓存
+
+    记录已确认存在的文件夹以及各文件夹的目录列表，
+    仅在目录变更监听器报告变化时失效，查找快捷方式不再访问文件系统；
+    监听线程与启动线程同时访问，缓存状态只在持有 _lock 时读写，文件系统访问在锁外进行
     """
-    获取指定F键对应的文件夹路径
+
+    def __init__(self, root: str):
+        self.root = root
+        self._provisioned: Set[str] = set()
+        self._entries: Dict[str, Dict[str, str]] = {}  # 文件夹 -> {小写文件名: 文件名}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._watcher: Optional[FolderWatcher] = None
+        self._listeners: List[Callable[[str], None]] = []
+
+    def provision(self, folder_path: str):
+        """确保文件夹存在（已确认存在时不访问文件系统）"""
+        with self._lock:
+            if folder_path in self._provisioned:
+                return
+            generation = self._generation
+        os.makedirs(folder_path, exist_ok=True)
+        with self._lock:
+            # 创建期间发生变更（如文件夹被删除）则不记录，下次重新确认
+            if generation == self._generation:
+                self._provisioned.add(folder_path)
+
+    def provision_all(self, f_keys):
+        """启动时批量创建基础目录及所有F键文件夹"""
+        self.provision(self.root)
+        for f_key in f_keys:
+            self.provision(os.path.join(self.root, f_key))
+
+    def entries(self, folder_path: str) -> Dict[str, str]:
+        """获取文件夹的目录列表（首次访问时扫描一次，文件夹不存在时为空）"""
+        with self._lock:
+            entries = self._entries.get(folder_path)
+            if entries is not None:
+                return entries
+            generation = self._generation
+        entries = {}
+        try:
+            with os.scandir(folder_path) as it:
+                for entry in it:
+                    entries[entry.name.lower()] = entry.name
+        except OSError:
+            pass
+        # 扫描期间发生变更则不缓存，避免保存过期结果
+        with self._lock:
+            if generation == self._generation:
+                self._entries[folder_path] = entries
+        return entries
+
+    def add_listener(self, callback: Callable[[str], None]):
+        """注册目录变更监听回调（在缓存失效后于监听线程中调用）"""
+        self._listeners.append(callback)
+
+    def invalidate(self, path: str):
+        """目录变更时使相关缓存失效"""
+        with self._lock:
+            self._generation += 1
+            if os.path.normcase(path) == os.path.normcase(self.root):
+                self._entries.clear()
+                self._provisioned.clear()
+            else:
+                self._entries.pop(path, None)
+                prefix = path + os.sep
+                for folder in [f for f in self._provisioned if f == path or f.startswith(prefix)]:
+                    self._provisioned.discard(folder)
+                for folder in [f for f in self._entries if f.startswith(prefix)]:
+                    self._entries.pop(folder, None)
+        for callback in self._listeners:
+            callback(path)
+
+    def start_watching(self):
+        """启动目录变更监听"""
+        if self._watcher is None:
+            self._watcher = FolderWatcher(self.root, self.invalidate)
+            self._watcher.start()
+
+    def stop_watching(self):
+        """停止目录变更监听"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+
+class Profile:
+    """绑定配置: 一个独立的快捷方式根目录及其预先扫描的文件夹缓存"""
+
+    def __init__(self, name: str, root: str):
+        self.name = name
+        self.root = root
+        self.cache = FolderCache(root)
+
+    def folder_path(self, f_key: str, layer: str = '') -> str:
+        """获取F键（及修饰键层）文件夹路径"""
+        if layer:
+            return os.path.join(self.root, f_key, layer)
+        return os.path.join(self.root, f_key)
+
+    def compile(self, f_keys: Iterable[str], layers: Iterable[str] = ()):
+        """创建所有F键文件夹并预先扫描各文件夹（含修饰键层子目录）的目录列表"""
+        f_keys = list(f_keys)
+        layers = list(layers)
+        self.cache.provision_all(f_keys)
+        for f_key in f_keys:
+            self.cache.entries(self.folder_path(f_key))
+            for layer in layers:
+                self.cache.entries(self.folder_path(f_key, layer))
+
+
+class ProfileManager:
+    """
+    绑定配置管理
+
+    所有配置在启动时预先扫描并各自监听目录变更；
+    切换只替换 active 引用（单次赋值），不重新注册热键，也不重新扫描文件夹
+    """
+
+    def __init__(self, roots: Dict[str, str]):
+        """
+        Args:
+            roots: 配置名称 -> 快捷方式根目录，第一个为初始配置
+        """
+        self.profiles: Dict[str, Profile] = {name: Profile(name, root) for name, root in roots.items()}
+        self.names: List[str] = list(self.profiles)
+        self.active: Profile = self.profiles[self.names[0]]
+        self._listeners: List[Callable[[Profile], None]] = []
+
+    def add_listener(self, callback: Callable[[Profile], None]):
+        """注册配置切换回调（在切换线程中调用）"""
+        self._listeners.append(callback)
+
+    def compile_all(self):
+        """预先扫描所有配置并开始监听目录变更"""
+        for profile in self.profiles.values():
+            profile.compile(F_KEYS.values(), MODIFIER_LAYERS.values())
+            profile.cache.start_watching()
+
+    def stop_watching(self):
+        """停止所有配置的目录变更监听"""
+        for profile in self.profiles.values():
+            profile.cache.stop_watching()
+
+    def switch(self, name: str) -> Optional[Profile]:
+        """
+        切换到指定配置
+
+        Returns:
+            切换后的配置，名称不存在时返回 None
+        """
+        profile = self.profiles.get(name)
+        if profile is None:
+            return None
+        if profile is not self.active:
+            self.active = profile
+            metrics.profile_switches_total.inc()
+            for callback in self._listeners:
+                callback(profile)
+        return profile
+
+    def cycle(self) -> Profile:
+        """切换到下一个配置"""
+        index = self.names.index(self.active.name)
+        return self.switch(self.names[(index + 1) % len(self.names)])
+
+
+# 全局绑定配置（未配置 PROFILES 时只有 BASE_PATH 一个默认配置）
+profiles = ProfileManager(PROFILES or {'默认': BASE_PATH})
+
+
+def get_folder_path(f_key: str, layer: str = '') -> str:
+    """
+    获取当前配置中指定F键对应的文件夹路径
     
     Args:
         f_key: F键名称，如 'F1', 'F2' 等
+        layer: 修饰键层子目录，如 'shift'，为空表示基础层
     
     Returns:
         文件夹完整路径
     """
-    return os.path.join(BASE_PATH, f_key)
+    return profiles.active.folder_path(f_key, layer)
 
 
-def ensure_folder_exists(f_key: str) -> str:
+def ensure_folder_exists(f_key: str, layer: str = '') -> str:
     """
     确保F键对应的文件夹存在，不存在则创建
     
     Args:
         f_key: F键名称，如 'F1', 'F2' 等
+        layer: 修饰键层子目录，为空表示基础层
     
     Returns:
         文件夹完整路径
     """
-    folder_path = get_folder_path(f_key)
-    if not os.path.exists(folder_path):
-        os.makedirs(folder_path)
+    profile = profiles.active
+    folder_path = profile.folder_path(f_key, layer)
+    profile.cache.provision(folder_path)
     return folder_path
 
 
-def open_folder(f_key: str) -> bool:
+def open_folder(f_key: str, layer: str = '') -> bool:
     """
     打开F键对应的文件夹（在资源管理器中）
     
     Args:
         f_key: F键名称，如 'F1', 'F2' 等
+        layer: 修饰键层子目录，为空表示基础层
     
     Returns:
         是否成功打开
     """
     try:
-        folder_path = ensure_folder_exists(f_key)
+        folder_path = ensure_folder_exists(f_key, layer)
         os.startfile(folder_path)
         return True
     except Exception as e:
-        print(f"打开文件夹失败: {e}")
+        metrics.launch_failures_total.inc()
+        record(EV_OPEN_FOLDER_FAILED, f_key, detail=str(e))
         return False
 
 
-def find_shortcut(f_key: str, letter: str) -> str | None:
+def find_shortcut(f_key: str, letter: str, layer: str = '') -> str | None:
     """
     在F键文件夹中查找以指定字母命名的快捷方式
     
     Args:
         f_key: F键名称，如 'F1', 'F2' 等
         letter: 字母键，如 'a', 'b' 等
+        layer: 修饰键层子目录，为空表示基础层
     
     Returns:
         快捷方式完整路径，未找到返回 None
     """
-    folder_path = get_folder_path(f_key)
-    
-    if not os.path.exists(folder_path):
-        return None
+    profile = profiles.active
+    folder_path = profile.folder_path(f_key, layer)
+    entries = profile.cache.entries(folder_path)
     
-    # 支持的快捷方式扩展名
-    extensions = ['.lnk', '.url', '']
-    
-    for ext in extensions:
-        # 尝试小写和大写字母
-        for name in [letter.lower(), letter.upper()]:
-            shortcut_path = os.path.join(folder_path, name + ext)
-            if os.path.exists(shortcut_path):
-                return shortcut_path
+    # 目录列表以小写文件名为键，大小写字母均可匹配
+    for ext in SHORTCUT_EXTENSIONS:
+        name = entries.get(letter.lower() + ext)
+        if name is not None:
+            return os.path.join(folder_path, name)
     
+    metrics.shortcut_misses_total.inc()
     return None
 
 
-def launch_shortcut(f_key: str, letter: str) -> bool:
+def launch_shortcut(f_key: str, letter: str, layer: str = '') -> bool:
     """
     启动指定的快捷方式
     
     Args:
         f_key: F键名称，如 'F1', 'F2' 等
         letter: 字母键，如 'a', 'b' 等
+        layer: 修饰键层子目录，为空表示基础层
     
     Returns:
         是否成功启动
     """
-    shortcut_path = find_shortcut(f_key, letter)
+    shortcut_path = find_shortcut(f_key, letter, layer)
     
     if shortcut_path is None:
         return False
     
+    return launch_path(shortcut_path, f_key, letter)
+
+
+def launch_path(shortcut_path: str, f_key: str = '', letter: str = '') -> bool:
+    """
+    启动指定路径的快捷方式或文件
+    
+    目标位于网络共享时只读取缓存的可达性，已知不可达立即失败，否则带硬超时启动
+    
+    Args:
+        shortcut_path: 快捷方式完整路径
+        f_key: F键名称，仅用于事件记录
+        letter: 字母键，仅用于事件记录
+    
+    Returns:
+        是否成功启动
+    """
     try:
-        os.startfile(shortcut_path)
+        share = network_share(resolve_target(shortcut_path))
+        if share is None:
+            os.startfile(shortcut_path)
+        else:
+            share_monitor.launch(share, os.startfile, shortcut_path)
         return True
     except Exception as e:
-        print(f"启动快捷方式失败: {e}")
+        metrics.launch_failures_total.inc()
+        record(EV_LAUNCH_FAILED, f_key, letter, detail=str(e))
         return False
 
 
 def init_base_folder():
     """
-    初始化基础文件夹
+    初始化基础文件夹（为所有配置批量创建F键文件夹、预先扫描并开始监听目录变更）
     """
-    if not os.path.exists(BASE_PATH):
-        os.makedirs(BASE_PATH)
+    profiles.compile_all()
 
 
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+PowerKey 浸泡测试
+使用模拟键盘/托盘后端和加速时钟连续运行若干模拟天，
+期间注入会话/电源事件，跟踪 RSS、线程数、tracemalloc 内存和 hook 表大小，任一指标持续增长即判定失败；
+可选在低占用模式下运行并检查常驻内存是否低于目标
+
+用法:
+    python soak_harness.py --days 7
+    python soak_harness.py --days 1 --low-footprint --rss-target-mb 24
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+
+import fake_backend
+
+FAKE_KEYBOARD = fake_backend.install()
+
+import keyboard_handler  # noqa: E402
+import metrics  # noqa: E402
+from keyboard_handler import KeyboardHandler, HEARTBEAT_INTERVAL  # noqa: E402
+from system_tray import SystemTray  # noqa: E402
+from diagnostics import get_rss_bytes, get_thread_count, memory_report, trim_memory  # noqa: E402
+from session_events import EVENT_RESUME, EVENT_UNLOCK  # noqa: E402
+
+# 每个模拟小时的心跳次数
+HEARTBEATS_PER_HOUR = int(3600 // HEARTBEAT_INTERVAL)
+
+
+class SoakSample:
+    """单次采样"""
+
+    __slots__ = ('hour', 'rss', 'resident', 'threads', 'traced', 'hooks')
+
+    def __init__(self, hour: int, rss: int, resident: int, threads: int, traced: int, hooks: int):
+        self.hour = hour
+        self.rss = rss
+        self.resident = resident  # 扣除 tracemalloc 自身开销后的 RSS
+        self.threads = threads
+        self.traced = traced
+        self.hooks = hooks
+
+
+def simulate_hour(handler: KeyboardHandler, tray: SystemTray, clock: fake_backend.FakeClock,
+                  session: fake_backend.FakeSessionEventSource, hour: int):
+    """模拟一小时的使用：睡眠恢复、组合键、修饰键放行、游戏模式、托盘切换与心跳刷新"""
+    # 睡眠一分钟后恢复并解锁，两个事件只重新注册一次
+    clock.advance(60)
+    rearms = metrics.session_rearms_total.value
+    session.fire(EVENT_RESUME)
+    session.fire(EVENT_UNLOCK)
+    if metrics.session_rearms_total.value - rearms != 1:
+        raise RuntimeError('恢复/解锁事件未合并为一次重新注册')
+
+    for _ in range(HEARTBEATS_PER_HOUR):
+        # 日常组合键
+        for trigger in ('enter', 'a', '1', 'z'):
+            FAKE_KEYBOARD.fire_hotkey(f'f1+{trigger}')
+            FAKE_KEYBOARD.fire_hotkey(f'f6+{trigger}')
+            clock.advance(1)
+
+        # 修饰键 + F 键放行（每次都会重新 hook）
+        FAKE_KEYBOARD.press('shift')
+        FAKE_KEYBOARD.tap('f1')
+        FAKE_KEYBOARD.tap('f10')
+        FAKE_KEYBOARD.release('shift')
+
+        clock.advance(HEARTBEAT_INTERVAL)
+        if not clock.wait_idle(sleepers=1):
+            raise RuntimeError('心跳线程未能在超时内完成刷新')
+
+    # 每小时进出游戏模式、隐藏再显示托盘
+    for _ in range(2):
+        FAKE_KEYBOARD.press('win')
+        FAKE_KEYBOARD.tap('esc')
+        FAKE_KEYBOARD.release('win')
+        clock.advance(1)
+
+        tray.toggle_visibility()
+        if tray._thread is not None and not tray.visible:
+            tray._thread.join(timeout=1)
+
+
+def take_sample(hour: int) -> SoakSample:
+    gc.collect()
+    rss = get_rss_bytes()
+    return SoakSample(
+        hour=hour,
+        rss=rss,
+        resident=rss - tracemalloc.get_tracemalloc_memory(),
+        threads=get_thread_count(),
+        traced=tracemalloc.get_traced_memory()[0],
+        hooks=FAKE_KEYBOARD.table_size(),
+    )
+
+
+def check_growth(samples, attr: str) -> float:
+    """比较稳定期首尾四分之一的均值，返回增长量（由调用方与允许值比较）"""
+    quarter = max(1, len(samples) // 4)
+    head = [getattr(s, attr) for s in samples[:quarter]]
+    tail = [getattr(s, attr) for s in samples[-quarter:]]
+    return sum(tail) / len(tail) - sum(head) / len(head)
+
+
+def run(days: int, warmup_hours: int, rss_tolerance: int, traced_tolerance: int, top: int,
+        low_footprint: bool = False, rss_target: int = 0) -> bool:
+    clock = fake_backend.FakeClock()
+    keyboard_handler.time = clock
+
+    handler = KeyboardHandler()
+    handler.set_callbacks(
+        on_open_folder=lambda f_key, layer='': None,
+        on_launch_shortcut=lambda f_key, trigger, layer='': None,
+        on_game_mode_toggle=lambda is_game_mode: None,
+    )
+    tray = SystemTray(low_footprint=low_footprint)
+    session = fake_backend.FakeSessionEventSource()
+    session.add_listener(lambda event: handler.rearm())
+
+    tracemalloc.start(25)
+    handler.start()
+    session.start()
+    tray.start()
+    clock.wait_idle(sleepers=1)
+
+    total_hours = days * 24
+    baseline_snapshot = None
+    samples = []
+    for hour in range(total_hours):
+        simulate_hour(handler, tray, clock, session, hour)
+        if hour + 1 == warmup_hours:
+            if low_footprint:
+                # 与程序启动完成后一样回收内存
+                print(f"回收内存: {trim_memory() / 1024:.0f}KiB")
+            gc.collect()
+            baseline_snapshot = tracemalloc.take_snapshot()
+        if hour + 1 >= warmup_hours:
+            samples.append(take_sample(hour + 1))
+        if (hour + 1) % 24 == 0 and samples:
+            s = samples[-1]
+            print(f"第 {(hour + 1) // 24} 天: RSS={s.rss / 1024 / 1024:.1f}MiB "
+                  f"线程={s.threads} traced={s.traced / 1024:.0f}KiB hook表={s.hooks} "
+                  f"重新注册: 心跳={metrics.hook_refreshes_total.value} 会话={metrics.session_rearms_total.value}")
+
+    final_snapshot = tracemalloc.take_snapshot()
+    print()
+    print(memory_report(top))
+    session.stop()
+    handler.running = False
+    clock.advance(HEARTBEAT_INTERVAL)
+    handler.stop()
+    tray.stop()
+
+    print()
+    print(f"tracemalloc 增长最多的 {top} 处分配:")
+    for stat in final_snapshot.compare_to(baseline_snapshot, 'lineno')[:top]:
+        print(f"  {stat}")
+    tracemalloc.stop()
+
+    checks = [
+        ('RSS', '增长', check_growth(samples, 'rss'), rss_tolerance),
+        ('tracemalloc', '增长', check_growth(samples, 'traced'), traced_tolerance),
+        ('线程数', '增长', max(s.threads for s in samples) - samples[0].threads, 0),
+        ('hook 表', '增长', max(s.hooks for s in samples) - samples[0].hooks, 0),
+    ]
+    if rss_target:
+        checks.append(('常驻内存', '峰值', max(s.resident for s in samples), rss_target))
+    passed = True
+    print()
+    for name, kind, value, limit in checks:
+        ok = value <= limit
+        passed = passed and ok
+        print(f"  [{'通过' if ok else '失败'}] {name}: {kind} {value:.0f}（允许 {limit}）")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PowerKey 浸泡测试')
+    parser.add_argument('--days', type=int, default=7, help='模拟运行天数')
+    parser.add_argument('--warmup-hours', type=int, default=6, help='预热小时数，不计入增长判定')
+    parser.add_argument('--rss-tolerance-mb', type=float, default=4.0, help='允许的 RSS 增长 (MiB)')
+    parser.add_argument('--traced-tolerance-kb', type=float, default=256.0, help='允许的 tracemalloc 增长 (KiB)')
+    parser.add_argument('--top', type=int, default=10, help='输出增长最多的分配数量')
+    parser.add_argument('--low-footprint', action='store_true', help='以低占用模式运行托盘，并在预热结束时回收内存')
+    parser.add_argument('--rss-target-mb', type=float, default=0.0,
+                        help='常驻内存上限 (MiB，扣除 tracemalloc 自身开销)，0 表示不检查（默认）')
+    args = parser.parse_args()
+
+    if args.days * 24 <= args.warmup_hours:
+        parser.error('--days 必须覆盖预热时间')
+
+    passed = run(
+        days=args.days,
+        warmup_hours=args.warmup_hours,
+        rss_tolerance=int(args.rss_tolerance_mb * 1024 * 1024),
+        traced_tolerance=int(args.traced_tolerance_kb * 1024),
+        top=args.top,
+        low_footprint=args.low_footprint,
+        rss_target=int(args.rss_target_mb * 1024 * 1024),
+    )
+    print()
+    print("浸泡测试通过" if passed else "浸泡测试失败: 存在无界增长或超出常驻内存上限")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    main()
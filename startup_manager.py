@@ -7,6 +7,7 @@
 import os
 import sys
 import winreg
+from event_log import record, EV_AUTOSTART_ENABLED, EV_AUTOSTART_DISABLED, EV_AUTOSTART_FAILED
 
 
 # 注册表路径
@@ -75,10 +76,10 @@ def enable_startup() -> bool:
         executable_path = get_executable_path()
         winreg.SetValueEx(key, APP_NAME, 0, winreg.REG_SZ, executable_path)
         winreg.CloseKey(key)
-        print(f"已启用开机自启动: {executable_path}")
+        record(EV_AUTOSTART_ENABLED, detail=executable_path)
         return True
     except Exception as e:
-        print(f"启用开机自启动失败: {e}")
+        record(EV_AUTOSTART_FAILED, detail=f"启用失败: {e}")
         return False
 
 
@@ -99,12 +100,12 @@ def disable_startup() -> bool:
         try:
             winreg.DeleteValue(key, APP_NAME)
             winreg.CloseKey(key)
-            print("已禁用开机自启动")
+            record(EV_AUTOSTART_DISABLED)
             return True
         except WindowsError:
             # 项不存在，认为是成功
             winreg.CloseKey(key)
             return True
     except Exception as e:
-        print(f"禁用开机自启动失败: {e}")
+        record(EV_AUTOSTART_FAILED, detail=f"禁用失败: {e}")
         return False
@@ -1,20 +1,56 @@
 # -*- coding: utf-8 -*-
 """
 系统托盘图标管理
-提供退出程序和开机自启动功能
+提供退出程序和开机自启动功能，图标和提示文字反映当前运行状态
 """
 
 import os
 import sys
-import threading
-from typing import Callable, Optional
+from typing import Callable, Dict, Iterable, Optional
 import pystray
 from PIL import Image, ImageDraw
 from startup_manager import is_startup_enabled, enable_startup, disable_startup
+from event_log import event_log, record, EV_TRAY_FAILED
+from hook_watchdog import hook_watchdog
+from shortcut_manager import profiles
+from config import LOG_DIR, LOW_FOOTPRINT, LOW_FOOTPRINT_ICON_SIZE
+from diagnostics import write_memory_report
+from thread_roles import start_thread, ROLE_BACKGROUND
 
+# 托盘图标状态
+STATE_NORMAL = 'normal'
+STATE_GAME_MODE = 'game_mode'
+STATE_DEGRADED = 'degraded'  # hook 回调卡顿后键盘钩子可能已被系统移除，等待重新注册
 
-def create_icon_image():
-    """创建托盘图标图像"""
+STATE_TITLES = {
+    STATE_NORMAL: '运行中',
+    STATE_GAME_MODE: '游戏模式',
+    STATE_DEGRADED: '键盘钩子可能失效',
+}
+
+# 状态角标颜色（None 表示不绘制角标）
+STATE_BADGES = {
+    STATE_NORMAL: None,
+    STATE_GAME_MODE: (255, 152, 0, 255),  # 橙色
+    STATE_DEGRADED: (244, 67, 54, 255),  # 红色
+}
+
+
+def create_icon_image(max_size: int = 0):
+    """
+    创建托盘图标图像
+
+    Args:
+        max_size: 图像最大边长（像素），0 表示保持原尺寸
+    """
+    image = _load_icon_image()
+    if max_size and max(image.size) > max_size:
+        image.thumbnail((max_size, max_size))
+    return image
+
+
+def _load_icon_image():
+    """加载图标文件，不存在时绘制默认图标"""
     # 尝试加载自定义图标
     icon_path = os.path.join(os.path.dirname(__file__), 'icons.ico')
 
@@ -34,7 +70,7 @@ def create_icon_image():
                 img = img.convert('RGBA')
             return img
         except Exception as e:
-            print(f"加载图标失败: {e}")
+            record(EV_TRAY_FAILED, detail=f"加载图标失败: {e}")
 
     # 如果没有图标文件，创建一个简单的图标
     width = 64
@@ -57,29 +93,69 @@ def create_icon_image():
     return image
 
 
+def render_icon_variants(states: Iterable[str] = tuple(STATE_BADGES), max_size: int = 0) -> Dict[str, Image.Image]:
+    """
+    渲染各状态的托盘图标（基础图标加右下角状态角标）
+
+    Args:
+        states: 需要渲染的状态，默认全部
+        max_size: 图像最大边长（像素），0 表示保持原尺寸
+    """
+    base = create_icon_image(max_size)
+    variants = {}
+    for state in states:
+        color = STATE_BADGES[state]
+        image = base.copy()
+        if color is not None:
+            width, height = image.size
+            diameter = min(width, height) * 7 // 16
+            box = (width - diameter - 1, height - diameter - 1, width - 1, height - 1)
+            ImageDraw.Draw(image).ellipse(box, fill=color, outline=(255, 255, 255, 255), width=max(1, width // 32))
+        variants[state] = image
+    return variants
+
+
 class SystemTray:
     """系统托盘图标管理器"""
 
-    def __init__(self, on_exit: Optional[Callable] = None, on_restart: Optional[Callable] = None):
+    def __init__(self, on_exit: Optional[Callable] = None, on_restart: Optional[Callable] = None,
+                 on_switch_profile: Optional[Callable[[str], None]] = None, low_footprint: bool = LOW_FOOTPRINT):
         """
         初始化系统托盘
 
         Args:
             on_exit: 退出程序时的回调函数
             on_restart: 重启程序时的回调函数
+            on_switch_profile: 选择绑定配置时的回调函数，参数为配置名称
+            low_footprint: 低占用模式，只保留当前状态的小尺寸图标，隐藏托盘时释放图标
         """
         self.on_exit = on_exit
         self.on_restart = on_restart
+        self.on_switch_profile = on_switch_profile
+        self.low_footprint = low_footprint
         self.icon = None
         self.running = False
         self.visible = True  # 托盘是否可见
         self._thread = None
 
+        # 运行状态及已渲染的状态图标（普通模式下一次渲染全部状态并在托盘隐藏后重新显示时复用）
+        self.game_mode = False
+        self.degraded = False
+        self._variants: Optional[Dict[str, Image.Image]] = None
+
     def _create_menu(self):
         """创建托盘菜单"""
         startup_enabled = is_startup_enabled()
 
+        profile_items = []
+        if len(profiles.names) > 1:
+            profile_items = [
+                pystray.MenuItem('绑定配置', pystray.Menu(*(self._profile_item(name) for name in profiles.names))),
+                pystray.Menu.SEPARATOR,
+            ]
+
         return pystray.Menu(
+            *profile_items,
             pystray.MenuItem(
                 '开机自启动',
                 self._toggle_startup,
@@ -89,6 +165,10 @@ class SystemTray:
                 '隐藏托盘',
                 self._hide_tray
             ),
+            pystray.MenuItem(
+                '导出诊断日志',
+                self._flush_log
+            ),
             pystray.Menu.SEPARATOR,
             pystray.MenuItem(
                 '退出程序',
@@ -96,6 +176,15 @@ class SystemTray:
             )
         )
 
+    def _profile_item(self, name: str):
+        """创建绑定配置菜单项（当前配置显示为选中）"""
+
+        def action(icon, item):
+            if self.on_switch_profile:
+                self.on_switch_profile(name)
+
+        return pystray.MenuItem(name, action, checked=lambda item: profiles.active.name == name, radio=True)
+
     def _toggle_startup(self, icon, item):
         """切换开机自启动状态"""
         if is_startup_enabled():
@@ -106,6 +195,16 @@ class SystemTray:
         # 更新菜单
         icon.menu = self._create_menu()
 
+    def _flush_log(self, icon, item):
+        """将内存中的事件日志写入文件并打开日志目录"""
+        event_log.flush()
+        hook_watchdog.write_report()
+        write_memory_report()
+        try:
+            os.startfile(LOG_DIR)
+        except Exception:
+            pass
+
     def _hide_tray(self, icon, item):
         """隐藏托盘图标"""
         self.visible = False
@@ -122,6 +221,55 @@ class SystemTray:
             self.visible = True
             self.start()
 
+    @property
+    def state(self) -> str:
+        """当前图标状态（键盘钩子异常优先于游戏模式）"""
+        if self.degraded:
+            return STATE_DEGRADED
+        if self.game_mode:
+            return STATE_GAME_MODE
+        return STATE_NORMAL
+
+    @property
+    def title(self) -> str:
+        """托盘提示文字: 当前状态及绑定配置"""
+        title = f"PowerKey - {STATE_TITLES[self.state]}"
+        if len(profiles.names) > 1:
+            title += f" [{profiles.active.name}]"
+        return title
+
+    def set_game_mode(self, game_mode: bool):
+        """更新游戏模式状态"""
+        self.game_mode = game_mode
+        self.update_state()
+
+    def set_degraded(self, degraded: bool):
+        """更新键盘钩子异常状态"""
+        self.degraded = degraded
+        self.update_state()
+
+    def _image(self) -> Image.Image:
+        """当前状态的图标（低占用模式下只渲染并保留当前状态的一张小尺寸图像）"""
+        state = self.state
+        if self._variants is None or state not in self._variants:
+            if self.low_footprint:
+                self._variants = render_icon_variants((state,), LOW_FOOTPRINT_ICON_SIZE)
+            else:
+                self._variants = render_icon_variants()
+        return self._variants[state]
+
+    def update_state(self):
+        """将当前状态应用到托盘图标（只替换已渲染的图像和提示文字，不重启托盘线程）"""
+        icon = self.icon
+        if icon is None or not self.running:
+            return
+        image = self._image()
+        if icon.icon is not image:
+            icon.icon = image
+        title = self.title
+        if icon.title != title:
+            icon.title = title
+
     def _on_left_click(self, icon, item):
         """处理左键点击 - 重启程序"""
         if self.on_restart:
@@ -140,14 +288,13 @@ class SystemTray:
 
         self.running = True
 
-        # 创建图标
-        image = create_icon_image()
+        # 创建图标（普通模式下各状态图标只渲染一次）
         menu = self._create_menu()
 
         self.icon = pystray.Icon(
             name='PowerKey',
-            icon=image,
-            title='PowerKey - 功能键快捷启动器',
+            icon=self._image(),
+            title=self.title,
             menu=menu
         )
 
@@ -155,18 +302,21 @@ class SystemTray:
         self.icon.on_activate = self._on_left_click
 
         # 在单独的线程中运行托盘图标
-        self._thread = threading.Thread(target=self._run_icon, daemon=True)
-        self._thread.start()
+        self._thread = start_thread(self._run_icon, ROLE_BACKGROUND, 'PowerKey-tray', self.icon)
 
-    def _run_icon(self):
+    def _run_icon(self, icon):
         """在线程中运行托盘图标"""
         try:
-            self.icon.run()
+            icon.run()
         except Exception as e:
-            print(f"系统托盘运行出错: {e}")
+            record(EV_TRAY_FAILED, detail=str(e))
 
     def stop(self):
         """停止系统托盘"""
         if self.icon:
             self.icon.stop()
         self.running = False
+        if self.low_footprint:
+            # 低占用模式下隐藏托盘即释放图标和图像，重新显示时再渲染
+            self.icon = None
+            self._variants = None
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""
+测试配置
+在导入任何 PowerKey 模块之前安装模拟后端（键盘、托盘、注册表），测试可在任意平台运行
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_backend  # noqa: E402
+
+FAKE_KEYBOARD = fake_backend.install()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""hook 卡顿看门狗: 空闲时不轮询，回调超出预算时采集调用栈"""
+
+import time
+
+import pytest
+
+from hook_watchdog import HookWatchdog
+
+
+@pytest.fixture
+def watchdog(monkeypatch):
+    """预算 50ms 的看门狗，统计 check 调用次数"""
+    dog = HookWatchdog(budget=0.05)
+    dog.checks = 0
+    check = dog.check
+
+    def counted():
+        dog.checks += 1
+        return check()
+
+    monkeypatch.setattr(dog, 'check', counted)
+    dog.start()
+    yield dog
+    dog.stop()
+
+
+def test_idle_watchdog_does_not_poll(watchdog):
+    time.sleep(0.3)
+    assert watchdog.checks == 0
+
+
+def test_stall_detected_then_polling_stops(watchdog):
+    watchdog.enter('dispatch', 'F1', 'a')
+    time.sleep(0.2)
+    watchdog.exit()
+    time.sleep(0.05)
+    assert watchdog.stall_count == 1
+    assert watchdog.stalls[0].f_key == 'F1'
+
+    checks = watchdog.checks
+    time.sleep(0.2)
+    assert watchdog.checks == checks
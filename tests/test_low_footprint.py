@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""低占用模式: 启动后回收内存，常驻内存低于目标"""
+
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+import main
+from config import LOW_FOOTPRINT_ICON_SIZE, LOW_FOOTPRINT_RSS_TARGET
+from keyboard_handler import KeyboardHandler
+from system_tray import SystemTray, STATE_NORMAL
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 在子进程中以低占用模式启动完整程序（真实的 PIL 和 pystray，只模拟键盘 hook），回收内存后输出 RSS
+LOW_FOOTPRINT_APP = '''
+import sys, threading, time
+sys.path.insert(0, {root!r})
+import fake_backend
+fake_backend.install(fake_tray=False)
+try:
+    import PIL.Image, PIL.ImageDraw, pystray
+except Exception as e:
+    print(f"SKIP 缺少真实的托盘依赖: {{e!r}}")
+    sys.exit(0)
+import config
+config.LOW_FOOTPRINT = True
+config.LOW_FOOTPRINT_TRIM_DELAY = 0.5
+import main
+from diagnostics import get_rss_bytes
+app = main.PowerKey()
+thread = threading.Thread(target=app.run, daemon=True)
+thread.start()
+time.sleep(3)
+print(f"RSS {{get_rss_bytes()}}")
+app._running = False
+thread.join(timeout=5)
+'''
+
+
+def measure_app_rss() -> int:
+    """启动低占用模式的程序并返回回收内存后的 RSS（字节），依赖缺失时跳过测试"""
+    script = LOW_FOOTPRINT_APP.format(root=ROOT)
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=60)
+    lines = [line for line in result.stdout.splitlines() if line.startswith(('RSS ', 'SKIP '))]
+    assert lines, result.stdout + result.stderr
+    if lines[-1].startswith('SKIP '):
+        pytest.skip(lines[-1][5:])
+    return int(lines[-1][4:])
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """以低占用模式启动键盘监听和托盘"""
+    monkeypatch.setattr(main, 'LOW_FOOTPRINT', True)
+    handler = KeyboardHandler()
+    handler.set_callbacks(
+        on_open_folder=lambda f_key, layer='': None,
+        on_launch_shortcut=lambda f_key, trigger, layer='': None,
+        on_game_mode_toggle=lambda is_game_mode: None,
+    )
+    tray = SystemTray(low_footprint=True)
+    handler.start()
+    tray.start()
+    yield handler, tray
+    tray.stop()
+    handler.stop()
+
+
+def test_tray_keeps_single_small_icon(app):
+    handler, tray = app
+    assert list(tray._variants) == [STATE_NORMAL]
+    assert max(tray.icon.icon.size) <= LOW_FOOTPRINT_ICON_SIZE
+
+    tray.toggle_visibility()
+    assert tray.icon is None and tray._variants is None
+
+
+def test_non_essential_notifications_skip_notifier(app, monkeypatch):
+    shown = []
+    plyer = types.ModuleType('plyer')
+    plyer.notification = types.SimpleNamespace(notify=lambda title, message, **kwargs: shown.append(message))
+    monkeypatch.setitem(sys.modules, 'plyer', plyer)
+
+    main.notification_worker.start()
+    main.show_notification('PowerKey', '游戏模式已开启')
+    main.show_notification('PowerKey', '网络位置不可达', essential=True)
+    main.notification_worker.stop()
+    assert shown == ['网络位置不可达']
+
+
+def test_resident_memory_under_target_after_trim():
+    rss = measure_app_rss()
+    if not rss:
+        pytest.skip('当前平台无法获取 RSS')
+    assert rss < LOW_FOOTPRINT_RSS_TARGET, f"RSS {rss / 1024 / 1024:.1f} MiB"
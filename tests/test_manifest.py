@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""绑定清单: 导出优先级与 URL 目标校验"""
+
+import pytest
+
+from manifest import Binding, export_bindings, import_bindings
+from shell_link import ShellLink, write_shortcut
+
+
+def test_export_prefers_lnk_regardless_of_case(tmp_path):
+    folder = tmp_path / 'F1'
+    folder.mkdir()
+    # 大小写敏感排序时 'B.url' 排在 'b.lnk' 之前
+    write_shortcut(str(folder / 'B.url'), ShellLink('https://example.com'))
+    write_shortcut(str(folder / 'b.lnk'), ShellLink('C:\\Tools\\b.exe'))
+
+    assert export_bindings(str(tmp_path)) == [Binding('F1', 'b', 'C:\\Tools\\b.exe')]
+
+
+def test_url_target_rejects_arguments():
+    with pytest.raises(ValueError, match='arguments'):
+        Binding.from_dict({'f_key': 'F1', 'trigger': 'a', 'target': 'https://example.com', 'arguments': '--x'})
+
+
+def test_round_trip(tmp_path):
+    bindings = [
+        Binding('F1', 'a', 'C:\\Program Files\\App\\app.exe', '--profile default', 'C:\\Users\\me'),
+        Binding('F6', 'g', 'https://github.com', working_dir='C:\\Users\\me'),
+    ]
+    result = import_bindings(bindings, str(tmp_path))
+    assert result.written == len(bindings) and not result.failed
+    assert export_bindings(str(tmp_path)) == bindings
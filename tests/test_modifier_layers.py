@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""修饰键层: 所有层共用一次分发表查找，增加层不增加注册数量"""
+
+import pytest
+
+import keyboard_handler
+from conftest import FAKE_KEYBOARD
+from keyboard_handler import KeyboardHandler
+
+
+def _registered(monkeypatch, layers):
+    """按指定的修饰键层注册全部组合键，返回 (处理器, 注册数量, 回调记录)"""
+    monkeypatch.setattr(keyboard_handler, 'LAYER_MASKS', layers)
+    handler = KeyboardHandler()
+    calls = []
+    handler.set_callbacks(
+        on_open_folder=lambda f_key, layer='': calls.append((f_key, 'enter', layer)),
+        on_launch_shortcut=lambda f_key, trigger, layer='': calls.append((f_key, trigger, layer)),
+        on_game_mode_toggle=lambda is_game_mode: None,
+    )
+    before = FAKE_KEYBOARD.table_size()
+    handler._register_f_key_hooks()
+    handler._register_shortcut_hotkeys()
+    return handler, FAKE_KEYBOARD.table_size() - before, calls
+
+
+@pytest.fixture
+def unregister():
+    handlers = []
+    yield handlers.append
+    for handler in handlers:
+        handler._unregister_shortcut_hotkeys()
+        handler._unregister_f_key_hooks()
+    FAKE_KEYBOARD.release('shift', 'ctrl')
+
+
+def test_layers_do_not_multiply_registrations(monkeypatch, unregister):
+    one, one_count, _ = _registered(monkeypatch, {1: 'shift'})
+    unregister(one)
+    three, three_count, _ = _registered(monkeypatch, {1: 'shift', 2: 'ctrl', 3: 'cs'})
+    unregister(three)
+    assert three_count == one_count
+    assert len(three.dispatch_table) == 2 * len(one.dispatch_table)
+
+
+def test_layer_resolved_from_current_modifier_mask(monkeypatch, unregister):
+    handler, _, calls = _registered(monkeypatch, {1: 'shift', 3: 'cs'})
+    unregister(handler)
+
+    FAKE_KEYBOARD.press('shift', 'ctrl')
+    FAKE_KEYBOARD.key_down('f10')
+    FAKE_KEYBOARD.tap('a')
+    FAKE_KEYBOARD.release('ctrl')
+    FAKE_KEYBOARD.tap('enter')
+    FAKE_KEYBOARD.key_up('f10')
+    assert calls == [('F10', 'a', 'cs'), ('F10', 'enter', 'shift')]
+
+    # 未触发任何绑定时松开 F 键补发原按键
+    sent = FAKE_KEYBOARD.sent
+    FAKE_KEYBOARD.key_down('f9')
+    FAKE_KEYBOARD.key_up('f9')
+    assert FAKE_KEYBOARD.sent == sent + 1
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""文件夹缓存: 重复启动不再扫描目录或创建文件夹"""
+
+import os
+
+import pytest
+
+import shortcut_manager
+from shortcut_manager import Profile, ProfileManager, ensure_folder_exists, find_shortcut
+
+F_KEYS = ['F1', 'F6']
+LAUNCHES = 50
+
+
+@pytest.fixture
+def syscalls(monkeypatch):
+    """统计 os.scandir / os.makedirs 调用次数"""
+    counts = {'scandir': 0, 'makedirs': 0}
+    scandir, makedirs = os.scandir, os.makedirs
+
+    def counting_scandir(path):
+        counts['scandir'] += 1
+        return scandir(path)
+
+    def counting_makedirs(path, exist_ok=False):
+        counts['makedirs'] += 1
+        return makedirs(path, exist_ok=exist_ok)
+
+    monkeypatch.setattr(os, 'scandir', counting_scandir)
+    monkeypatch.setattr(os, 'makedirs', counting_makedirs)
+    return counts
+
+
+@pytest.fixture
+def profile(tmp_path, monkeypatch):
+    """以临时目录为根的单一配置，F1 中有 a.lnk"""
+    manager = ProfileManager({'test': str(tmp_path)})
+    monkeypatch.setattr(shortcut_manager, 'profiles', manager)
+    (tmp_path / 'F1').mkdir()
+    (tmp_path / 'F1' / 'a.lnk').write_bytes(b'')
+    return manager.active
+
+
+def test_repeated_launches_do_not_touch_filesystem(profile: Profile, syscalls):
+    profile.compile(F_KEYS)
+    assert syscalls == {'scandir': len(F_KEYS), 'makedirs': 1 + len(F_KEYS)}
+
+    for _ in range(LAUNCHES):
+        assert find_shortcut('F1', 'a') == os.path.join(profile.root, 'F1', 'a.lnk')
+        assert find_shortcut('F6', 'b') is None
+        ensure_folder_exists('F1')
+    assert syscalls == {'scandir': len(F_KEYS), 'makedirs': 1 + len(F_KEYS)}
+
+
+def test_invalidate_rescans_only_changed_folder(profile: Profile, syscalls):
+    profile.compile(F_KEYS)
+    before = dict(syscalls)
+
+    open(os.path.join(profile.root, 'F6', 'b.lnk'), 'wb').close()
+    profile.cache.invalidate(os.path.join(profile.root, 'F6'))
+    for _ in range(LAUNCHES):
+        assert find_shortcut('F6', 'b') == os.path.join(profile.root, 'F6', 'b.lnk')
+        find_shortcut('F1', 'a')
+    assert syscalls['scandir'] == before['scandir'] + 1
+    assert syscalls['makedirs'] == before['makedirs']
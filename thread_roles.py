@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+线程角色与优先级
+键盘 hook 所在的分发线程以高优先级运行且只做查表分发，
+启动程序、通知、索引、托盘等工作放在低于正常优先级的线程中执行
+"""
+
+import os
+import queue
+import sys
+import threading
+from typing import Callable, Dict, Optional
+
+# 线程角色
+ROLE_DISPATCHER = 'dispatcher'  # 键盘 hook 回调线程
+ROLE_WORKER = 'worker'  # 启动程序、通知
+ROLE_BACKGROUND = 'background'  # 索引、目录监听、心跳、日志、指标、托盘
+
+# Windows 线程优先级
+THREAD_PRIORITY_HIGHEST = 2
+THREAD_PRIORITY_NORMAL = 0
+THREAD_PRIORITY_BELOW_NORMAL = -1
+
+# Windows 线程优先级 -> Linux nice 值的换算系数（HIGHEST -> -10，BELOW_NORMAL -> 5）
+NICE_PER_PRIORITY_LEVEL = 5
+
+ROLE_PRIORITIES = {
+    ROLE_DISPATCHER: THREAD_PRIORITY_HIGHEST,
+    ROLE_WORKER: THREAD_PRIORITY_BELOW_NORMAL,
+    ROLE_BACKGROUND: THREAD_PRIORITY_BELOW_NORMAL,
+}
+
+
+class WindowsPriorityBackend:
+    """通过 SetThreadPriority 设置当前线程优先级"""
+
+    def __init__(self):
+        import ctypes
+        self._kernel32 = ctypes.windll.kernel32
+
+    def set_current(self, priority: int) -> bool:
+        return bool(self._kernel32.SetThreadPriority(self._kernel32.GetCurrentThread(), priority))
+
+
+class NullPriorityBackend:
+    """非 Windows 平台的空实现，只记录每个线程请求的优先级"""
+
+    def __init__(self):
+        self.applied: Dict[int, int] = {}  # 线程 ident -> 优先级
+
+    def set_current(self, priority: int) -> bool:
+        self.applied[threading.get_ident()] = priority
+        return True
+
+
+class NicePriorityBackend:
+    """
+    通过 Linux 线程 nice 值设置当前线程优先级
+
+    Linux 按线程调度，nice 值只作用于当前线程；提高优先级（负 nice）需要 CAP_SYS_NICE，
+    权限不足时设置失败。非 Windows 平台默认仍使用空实现，基准测试用它在 Linux 上对比优先级的效果
+    """
+
+    def set_current(self, priority: int) -> bool:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), -priority * NICE_PER_PRIORITY_LEVEL)
+        return True
+
+
+backend = WindowsPriorityBackend() if sys.platform == 'win32' else NullPriorityBackend()
+
+# 线程 ident -> 角色
+_roles: Dict[int, str] = {}
+
+
+def set_thread_role(role: str) -> bool:
+    """
+    为当前线程设置角色及对应优先级
+
+    Returns:
+        是否设置成功
+    """
+    _roles[threading.get_ident()] = role
+    try:
+        return backend.set_current(ROLE_PRIORITIES[role])
+    except Exception:
+        return False
+
+
+def get_thread_role(ident: Optional[int] = None) -> Optional[str]:
+    """获取线程角色（默认当前线程）"""
+    return _roles.get(threading.get_ident() if ident is None else ident)
+
+
+def start_thread(target: Callable, role: str, name: Optional[str] = None, *args) -> threading.Thread:
+    """启动一个带角色的后台线程（daemon）"""
+    def run():
+        set_thread_role(role)
+        try:
+            target(*args)
+        finally:
+            _roles.pop(threading.get_ident(), None)
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
+
+
+class Worker:
+    """单线程任务队列，用于把耗时操作移出键盘 hook 线程"""
+
+    def __init__(self, name: str, role: str = ROLE_WORKER):
+        self.name = name
+        self.role = role
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """启动工作线程"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = start_thread(self._run, self.role, self.name)
+
+    def submit(self, function: Callable, *args):
+        """提交任务（不阻塞调用方）"""
+        self._queue.put((function, args))
+
+    def stop(self, timeout: float = 1.0):
+        """处理完已提交的任务后停止"""
+        self._queue.put(None)
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            if task is None:
+                break
+            function, args = task
+            try:
+                function(*args)
+            except Exception:
+                pass
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+全局搜索启动器
+按下搜索热键后弹出输入框，实时在全部F键文件夹中按文件名和目标名搜索快捷方式
+"""
+
+import threading
+from typing import Callable, List, Optional
+from search_index import SearchIndex, SearchEntry
+from thread_roles import start_thread, ROLE_WORKER
+
+# 最多显示的结果数
+MAX_RESULTS = 10
+
+
+class TypeAheadLauncher:
+    """搜索启动器窗口（每次打开在独立线程中运行 Tk 事件循环，不占用键盘 hook 线程）"""
+
+    def __init__(self, index: SearchIndex, on_launch: Callable[[str], None]):
+        """
+        初始化搜索启动器
+
+        Args:
+            index: 快捷方式搜索索引
+            on_launch: 选中结果后的启动回调，参数为快捷方式路径
+        """
+        self.index = index
+        self.on_launch = on_launch
+        self._thread: Optional[threading.Thread] = None
+
+    def show(self):
+        """打开搜索窗口（已打开时忽略）"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = start_thread(self._run, ROLE_WORKER, 'PowerKey-search')
+
+    def _run(self):
+        """创建窗口并运行事件循环"""
+        import tkinter as tk
+
+        root = tk.Tk()
+        root.title('PowerKey 搜索')
+        root.attributes('-topmost', True)
+        root.resizable(False, False)
+
+        query = tk.StringVar()
+        entry = tk.Entry(root, textvariable=query, width=48, font=('Microsoft YaHei UI', 12))
+        entry.pack(fill='x', padx=8, pady=(8, 4))
+        listbox = tk.Listbox(root, height=MAX_RESULTS, activestyle='none', font=('Microsoft YaHei UI', 10))
+        listbox.pack(fill='both', padx=8, pady=(0, 8))
+
+        results: List[SearchEntry] = []
+
+        def refresh(*_):
+            results[:] = self.index.search(query.get(), MAX_RESULTS)
+            listbox.delete(0, 'end')
+            for result in results:
+                listbox.insert('end', f"{result.display_name}    {result.binding}")
+            if results:
+                listbox.selection_set(0)
+
+        def move(step: int):
+            if not results:
+                return 'break'
+            current = listbox.curselection()
+            index = (current[0] if current else 0) + step
+            index = max(0, min(len(results) - 1, index))
+            listbox.selection_clear(0, 'end')
+            listbox.selection_set(index)
+            listbox.see(index)
+            return 'break'
+
+        def launch(*_):
+            current = listbox.curselection()
+            if results:
+                path = results[current[0] if current else 0].path
+                root.destroy()
+                self.on_launch(path)
+            return 'break'
+
+        query.trace_add('write', refresh)
+        entry.bind('<Down>', lambda e: move(1))
+        entry.bind('<Up>', lambda e: move(-1))
+        entry.bind('<Return>', launch)
+        listbox.bind('<Double-Button-1>', launch)
+        root.bind('<Escape>', lambda e: root.destroy())
+
+        # 居中显示并获取焦点
+        root.update_idletasks()
+        x = (root.winfo_screenwidth() - root.winfo_width()) // 2
+        y = root.winfo_screenheight() // 3
+        root.geometry(f"+{x}+{y}")
+        root.focus_force()
+        entry.focus_set()
+        root.mainloop()